@@ -2,9 +2,10 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from config import Config
+from app.storage import RoutingSession
 import re
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 login_manager.login_view = 'main.login'
 
@@ -20,17 +21,31 @@ def create_app():
 
 
 
+    from app.storage import engine_options, configure_engine, create_read_engine, wal_checkpointer
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
     db.init_app(app)
     login_manager.init_app(app)
 
+    with app.app_context():
+        configure_engine(app, db.engine)
+        app.extensions['read_engine'] = create_read_engine(app, db.engine)
+
+    @app.before_request
+    def start_wal_checkpointer():
+        wal_checkpointer.ensure_started(app, db.engine)
+
     # Add the nl2br filter to Jinja
     app.jinja_env.filters['nl2br'] = nl2br
 
-    from app.models import User
-    
+    # Fingerprinted, long-cached static files for templates
+    from app.assets import init_assets
+    init_assets(app)
+
     @login_manager.user_loader
     def load_user(id):
-        return User.query.get(int(id))
+        from app.cache import user_cache
+        return user_cache.load(int(id))
 
     from app.routes import main
     app.register_blueprint(main)
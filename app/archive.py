@@ -0,0 +1,130 @@
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.cache import settings_cache
+from app.models import (
+    ChecklistRecord, ChecklistNotes, CompletedItem, UserChecklist,
+    ArchivedChecklistRecord, ArchivedChecklistNotes, ArchivedCompletedItem, ArchivedUserChecklist
+)
+from app.write_queue import write_lock
+
+# Hot model -> archive model, children before the record they belong to.
+# Hot tables never reuse ids (AUTOINCREMENT on SQLite, sequences on
+# PostgreSQL), so an archived row's id stays unique across both tables.
+ARCHIVE_MODELS = [
+    (ChecklistNotes, ArchivedChecklistNotes, 'checklist_record_id'),
+    (CompletedItem, ArchivedCompletedItem, 'record_id'),
+    (UserChecklist, ArchivedUserChecklist, 'record_id'),
+    (ChecklistRecord, ArchivedChecklistRecord, 'id'),
+]
+_ARCHIVE_OF = {hot: cold for hot, cold, _ in ARCHIVE_MODELS}
+
+def archived_through():
+    """date_performed of the newest archived record, or None if nothing is archived"""
+    return db.session.query(func.max(ArchivedChecklistRecord.date_performed)).scalar()
+
+def _combined(model):
+    """`model` mapped over a UNION ALL of its hot and archive tables"""
+    hot, cold = model.__table__, _ARCHIVE_OF[model].__table__
+    names = [column.name for column in hot.columns]
+    combined = union_all(
+        select(*hot.columns),
+        select(*[cold.c[name] for name in names])
+    ).subquery(f"{hot.name}_all")
+    return aliased(model, combined)
+
+def record_model(start=None):
+    """ChecklistRecord, or a hot+archive alias when records from `start` may be archived
+
+    `start` is the earliest date_performed the query can match (None for
+    no lower bound). Queries that stay after the archive cutoff keep
+    reading the hot table alone.
+    """
+    cutoff = archived_through()
+    if cutoff is None or (start is not None and start > cutoff):
+        return ChecklistRecord
+    return _combined(ChecklistRecord)
+
+def detail_model(model, include_archive=None):
+    """CompletedItem, UserChecklist or ChecklistNotes, spanning the archive if any exists"""
+    if include_archive is None:
+        include_archive = archived_through() is not None
+    return _combined(model) if include_archive else model
+
+def record_model_of(query):
+    """The ChecklistRecord entity (plain or combined) a record query selects"""
+    return query.column_descriptions[0]['entity']
+
+def get_record(record_id):
+    """Fetch a record by id from the hot table, falling back to the archive"""
+    record = db.session.get(ChecklistRecord, record_id)
+    if record is None and archived_through() is not None:
+        combined = _combined(ChecklistRecord)
+        record = db.session.query(combined).filter(combined.id == record_id).first()
+    return record
+
+def _move_rows(record_ids):
+    # Copy the records before their children, which reference them
+    for hot, cold, record_column in reversed(ARCHIVE_MODELS):
+        hot_table, cold_table = hot.__table__, cold.__table__
+        names = [column.name for column in hot_table.columns]
+        condition = hot_table.c[record_column].in_(record_ids)
+        db.session.execute(insert(cold_table).from_select(
+            names, select(*hot_table.columns).where(condition)
+        ))
+    # Delete children first so nothing is left pointing at a missing record
+    for hot, _, record_column in ARCHIVE_MODELS:
+        db.session.execute(delete(hot.__table__).where(hot.__table__.c[record_column].in_(record_ids)))
+
+def archive_records(older_than_days=None, batch_size=None, progress=print):
+    """Move records performed more than `older_than_days` ago into the archive tables
+
+    Works in batches of `batch_size` records, each moved with its notes,
+    completed items and user selections in one transaction while holding
+    the write lock. Returns the number of records archived.
+    """
+    app = current_app._get_current_object()
+    if older_than_days is None:
+        older_than_days = app.config.get('ARCHIVE_AFTER_DAYS', 365)
+    batch_size = batch_size or app.config.get('ARCHIVE_BATCH_SIZE', 500)
+    # date_performed is local wall-clock time
+    cutoff = datetime.now(settings_cache.get().tz).replace(tzinfo=None) - timedelta(days=older_than_days)
+
+    archived = 0
+    while True:
+        started = time.monotonic()
+        with write_lock(app):
+            record_ids = [record_id for (record_id,) in db.session.query(ChecklistRecord.id).filter(
+                ChecklistRecord.date_performed < cutoff
+            ).order_by(ChecklistRecord.id).limit(batch_size)]
+            if not record_ids:
+                db.session.rollback()
+                break
+            try:
+                _move_rows(record_ids)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        archived += len(record_ids)
+        progress(f"Archived {archived} records ({(time.monotonic() - started) * 1000:.0f} ms for last batch)")
+
+    return archived
+
+def delete_archived_records(client_id):
+    """Remove a client's archived records and their details"""
+    record_ids = select(ArchivedChecklistRecord.id).where(
+        ArchivedChecklistRecord.client_id == client_id
+    )
+    for _, cold, record_column in ARCHIVE_MODELS:
+        table = cold.__table__
+        if cold is ArchivedChecklistRecord:
+            db.session.execute(delete(table).where(table.c.client_id == client_id))
+        else:
+            db.session.execute(delete(table).where(table.c[record_column].in_(record_ids)))
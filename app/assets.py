@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import abort, current_app, request, url_for
+from werkzeug.security import safe_join
+
+# Types worth gzipping; images and fonts are already compressed
+_COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+class Asset:
+    """A static file's content, its fingerprint and its gzipped variant"""
+
+    def __init__(self, path, mtime_ns):
+        with open(path, 'rb') as f:
+            self.body = f.read()
+        self.mtime_ns = mtime_ns
+        self.digest = hashlib.sha256(self.body).hexdigest()[:12]
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.gzipped = None
+        if self.mimetype.startswith(_COMPRESSIBLE_TYPES):
+            # mtime=0 keeps the compressed bytes identical across workers
+            gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if len(gzipped) < len(self.body):
+                self.gzipped = gzipped
+
+class AssetRegistry:
+    """Per-process registry of fingerprinted static files
+
+    Each file is read, hashed and compressed once; later requests are
+    served from memory. A file is reloaded if it changes on disk, which
+    also changes its URL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assets = {}
+
+    def get(self, filename, app=None):
+        app = app or current_app._get_current_object()
+        path = safe_join(app.static_folder, filename)
+        if path is None:
+            return None
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        with self._lock:
+            asset = self._assets.get(path)
+        if asset is None or asset.mtime_ns != mtime_ns:
+            asset = Asset(path, mtime_ns)
+            with self._lock:
+                self._assets[path] = asset
+        return asset
+
+asset_registry = AssetRegistry()
+
+def asset_url(filename):
+    """URL of a static file that changes whenever the file's content does"""
+    asset = asset_registry.get(filename)
+    if asset is None:
+        return url_for('static', filename=filename)
+    return url_for('asset', digest=asset.digest, filename=filename)
+
+def serve_asset(digest, filename):
+    asset = asset_registry.get(filename)
+    if asset is None:
+        abort(404)
+
+    if asset.gzipped is not None and request.accept_encodings['gzip']:
+        response = current_app.response_class(asset.gzipped, mimetype=asset.mimetype)
+        response.content_encoding = 'gzip'
+        response.set_etag(f"{asset.digest}-gzip")
+    else:
+        response = current_app.response_class(asset.body, mimetype=asset.mimetype)
+        response.set_etag(asset.digest)
+    response.vary.add('Accept-Encoding')
+
+    if digest == asset.digest:
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get('ASSET_MAX_AGE', 31536000)
+        response.cache_control.immutable = True
+    else:
+        # A page rendered before the file changed; serve it, but briefly
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def init_assets(app):
+    app.add_url_rule('/assets/<digest>/<path:filename>', 'asset', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from app.reports import build_report_pdf
+from app.storage import read_only
+
+# Flask app owned by each pool process, created once by _init_worker
+_worker_app = None
+
+# This process's pool of renderers, shared by every bulk export it serves
+_pool = None
+_pool_lock = threading.Lock()
+
+def _init_worker():
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+
+def _get_pool(max_workers=None):
+    """The process-wide renderer pool, started on first use
+
+    Children are spawned, not forked: the web process runs write-queue,
+    checkpointer and report-job threads, and a forked child could inherit
+    one of their locks held and hang. Each child builds its app once and
+    serves every later export.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, max_workers or os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return _pool
+
+def _discard_pool(pool):
+    """Forget a pool whose process died so the next export starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _render_client_report(client_id, start_date, end_date):
+    """Runs in a pool process; returns (pdf bytes, filename)"""
+    with _worker_app.app_context(), read_only():
+        return build_report_pdf('client', client_id, start_date, end_date)
+
+def _submit_reports(pool, client_ids, start_date, end_date):
+    return {
+        pool.submit(_render_client_report, client_id, start_date, end_date): client_id
+        for client_id in client_ids
+    }
+
+class _ZipStream:
+    """Write-only sink that lets zipfile produce an archive incrementally"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_bulk_reports_zip(client_ids, start_date=None, end_date=None, max_workers=None, logger=None):
+    """Render client reports in parallel processes and yield a ZIP archive in chunks
+
+    Each PDF is added to the archive as soon as its process finishes, so the
+    download starts before the slowest report is done. `max_workers` sizes
+    the process-wide pool when it is first started.
+    """
+    stream = _ZipStream()
+    errors = []
+
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+        pool = _get_pool(max_workers)
+        try:
+            futures = _submit_reports(pool, client_ids, start_date, end_date)
+        except BrokenProcessPool:
+            # A child died since the last export
+            _discard_pool(pool)
+            pool = _get_pool(max_workers)
+            futures = _submit_reports(pool, client_ids, start_date, end_date)
+        try:
+            for future in as_completed(futures):
+                try:
+                    pdf_bytes, filename = future.result()
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        _discard_pool(pool)
+                    if logger:
+                        logger.error(f"Error rendering report for client {futures[future]}: {str(e)}")
+                    errors.append(f"Client {futures[future]}: {str(e)}")
+                    continue
+                archive.writestr(filename, pdf_bytes)
+                yield stream.pop()
+        finally:
+            # The download may have been abandoned; don't render for nobody
+            for future in futures:
+                future.cancel()
+
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+
+    yield stream.pop()
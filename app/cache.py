@@ -0,0 +1,282 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+import pytz
+from flask import current_app
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session, joinedload
+
+from app import db
+from app.models import (
+    User, Role, Client, ClientUser, ChecklistItem, ChecklistCategory, ClientCategorySettings
+)
+from app.storage import RoutingSession
+
+class SharedVersion:
+    """Version token shared by every worker process through a small file
+
+    Bumping rewrites the file, which changes its inode and mtime; other
+    processes notice on their next check. Checks are throttled to one
+    stat() per `check_interval` seconds, so asking is nearly free.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._token = None
+        self._checked_at = 0.0
+
+    def _path(self, app):
+        cache_dir = app.config.get('CACHE_VERSION_DIR') or os.path.join(app.instance_path, 'cache_versions')
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, f"{self.name}.version")
+
+    def _read(self, app):
+        try:
+            stat = os.stat(self._path(app))
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def current(self, app=None):
+        app = app or current_app._get_current_object()
+        now = time.monotonic()
+        if now - self._checked_at >= app.config.get('CACHE_VERSION_CHECK_INTERVAL', 1):
+            with self._lock:
+                self._token = self._read(app)
+                self._checked_at = now
+        return self._token
+
+    def bump(self, app=None):
+        app = app or current_app._get_current_object()
+        path = self._path(app)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._token = self._read(app)
+            self._checked_at = time.monotonic()
+
+class CachedSettings:
+    """Immutable snapshot of the Settings row with its timezone resolved"""
+
+    def __init__(self, timezone):
+        self.timezone = timezone
+        self.tz = pytz.timezone(timezone)
+
+class SettingsCache:
+    """Process-wide Settings snapshot, reloaded when another worker saves a change
+
+    `SETTINGS_CACHE_TTL` bounds how stale a snapshot can get if the version
+    file is not shared (e.g. workers on different hosts).
+    """
+
+    def __init__(self):
+        self.version = SharedVersion('settings')
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_version = None
+        self._loaded_at = 0.0
+
+    def _load(self):
+        # Always read from the primary so a fresh save is never missed
+        timezone = db.session.execute(
+            select(db.metadata.tables['settings'].c.timezone).limit(1),
+            bind_arguments={'bind': db.engine}
+        ).scalar()
+        try:
+            return CachedSettings(timezone or 'UTC')
+        except pytz.UnknownTimeZoneError:
+            return CachedSettings('UTC')
+
+    def get(self):
+        app = current_app._get_current_object()
+        version = self.version.current(app)
+        snapshot = self._snapshot
+        if (snapshot is None or version != self._snapshot_version
+                or time.monotonic() - self._loaded_at > app.config.get('SETTINGS_CACHE_TTL', 60)):
+            with self._lock:
+                snapshot = self._load()
+                self._snapshot, self._snapshot_version = snapshot, version
+                self._loaded_at = time.monotonic()
+        return snapshot
+
+    def invalidate(self):
+        """Drop the snapshot here and in every other worker; call after committing"""
+        with self._lock:
+            self._snapshot = None
+        self.version.bump()
+
+settings_cache = SettingsCache()
+
+class UserCache:
+    """Per-process cache of users with their role and permissions loaded
+
+    Entries are detached User objects; load() attaches a copy to the
+    request's session with merge(load=False), which issues no SQL, so
+    current_user, has_permission and is_power_user cost no queries.
+    Any committed change to a User or Role clears every worker's cache.
+    """
+
+    def __init__(self):
+        self.version = SharedVersion('users')
+        self._lock = threading.Lock()
+        self._users = {}
+        self._users_version = None
+
+    def _fetch(self, user_id):
+        # A private session on the primary keeps the cached copy out of
+        # the request session and never reads a lagging replica
+        with Session(db.engine) as session:
+            return session.scalars(
+                select(User).options(joinedload(User.role)).filter_by(id=user_id)
+            ).first()
+
+    def load(self, user_id):
+        app = current_app._get_current_object()
+        version = self.version.current(app)
+        now = time.monotonic()
+        with self._lock:
+            if version != self._users_version:
+                self._users.clear()
+                self._users_version = version
+            entry = self._users.get(user_id)
+
+        if entry is None or now - entry[1] > app.config.get('USER_CACHE_TTL', 30):
+            user = self._fetch(user_id)
+            if user is None:
+                return None
+            with self._lock:
+                self._users[user_id] = (user, now)
+        else:
+            user = entry[0]
+        return db.session.merge(user, load=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._users.clear()
+        self.version.bump()
+
+user_cache = UserCache()
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _note_user_changes(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (User, Role)):
+            session.info['users_changed'] = True
+            return
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_user_cache(session):
+    if session.info.pop('users_changed', False):
+        user_cache.invalidate()
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_user_changes(session):
+    session.info.pop('users_changed', None)
+
+CachedCategory = namedtuple('CachedCategory', 'id name is_per_user')
+CachedItem = namedtuple('CachedItem', 'id description completed')
+CachedClientUser = namedtuple('CachedClientUser', 'id name')
+
+class ChecklistStructure:
+    """Read-only snapshot of a client's checklist: categories with their
+    items in display order, and the client's users"""
+
+    def __init__(self, version, items_by_category, users):
+        self.version = version
+        self.items_by_category = items_by_category
+        self.users = users
+
+class ChecklistStructureCache:
+    """Per-process cache of client checklist structures
+
+    Snapshots are keyed by client and tagged with Client.structure_version.
+    Routes that change a structure call bump() in the same transaction, so
+    the client row a request has already loaded says whether its snapshot
+    is current; no extra query or shared file is needed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._structures = OrderedDict()
+
+    def _build(self, client):
+        rows = db.session.execute(
+            select(
+                ChecklistCategory.id, ChecklistCategory.name,
+                ChecklistItem.id, ChecklistItem.description, ChecklistItem.completed
+            ).join(
+                ChecklistCategory, ChecklistItem.category_id == ChecklistCategory.id
+            ).filter(
+                ChecklistItem.client_id == client.id
+            ).order_by(ChecklistCategory.id, ChecklistItem.id)
+        ).all()
+        per_user = {
+            category_id: is_per_user
+            for category_id, is_per_user in db.session.execute(
+                select(ClientCategorySettings.category_id, ClientCategorySettings.is_per_user)
+                .filter_by(client_id=client.id)
+            )
+        }
+        users = tuple(
+            CachedClientUser(*row) for row in db.session.execute(
+                select(ClientUser.id, ClientUser.name)
+                .filter_by(client_id=client.id).order_by(ClientUser.id)
+            )
+        )
+
+        items_by_category = {}
+        categories = {}
+        for category_id, category_name, item_id, description, completed in rows:
+            category = categories.get(category_id)
+            if category is None:
+                category = categories[category_id] = CachedCategory(
+                    category_id, category_name, bool(per_user.get(category_id, False))
+                )
+                items_by_category[category] = []
+            items_by_category[category].append(CachedItem(item_id, description, completed))
+
+        return ChecklistStructure(
+            client.structure_version,
+            {category: tuple(items) for category, items in items_by_category.items()},
+            users
+        )
+
+    def get(self, client):
+        """Structure for a loaded Client, rebuilt if its version has moved on"""
+        with self._lock:
+            structure = self._structures.get(client.id)
+            if structure is not None and structure.version == client.structure_version:
+                self._structures.move_to_end(client.id)
+                return structure
+
+        structure = self._build(client)
+        max_size = current_app.config.get('CHECKLIST_CACHE_SIZE', 500)
+        with self._lock:
+            self._structures[client.id] = structure
+            self._structures.move_to_end(client.id)
+            while len(self._structures) > max_size:
+                self._structures.popitem(last=False)
+        return structure
+
+    def evict(self, client_id):
+        """Drop this process's snapshot of a client that was deleted or created"""
+        with self._lock:
+            self._structures.pop(client_id, None)
+
+    def bump(self, client_id=None):
+        """Mark a client's structure (or every client's) as changed
+
+        Call inside the transaction making the change, before committing.
+        """
+        statement = update(Client).values(structure_version=Client.structure_version + 1)
+        if client_id is not None:
+            statement = statement.where(Client.id == client_id)
+        db.session.execute(statement)
+
+checklist_cache = ChecklistStructureCache()
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import threading
+from functools import wraps
+
+from flask import current_app, request, session, make_response
+from flask_login import current_user
+
+from app.cache import settings_cache
+
+_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+
+def deployment_fingerprint(app=None):
+    """Hash of the templates and static files this process serves
+
+    Part of every view ETag, so a deploy that changes how pages render
+    never answers a revisit with a stale 304. Computed once per process;
+    every worker of a deploy arrives at the same value.
+    """
+    app = app or current_app._get_current_object()
+    with _fingerprint_lock:
+        if app.name not in _fingerprints:
+            digest = hashlib.sha256()
+            for folder in (os.path.join(app.root_path, app.template_folder), app.static_folder):
+                for root, dirs, files in os.walk(folder):
+                    dirs.sort()
+                    for filename in sorted(files):
+                        path = os.path.join(root, filename)
+                        digest.update(os.path.relpath(path, folder).encode())
+                        with open(path, 'rb') as f:
+                            digest.update(f.read())
+            _fingerprints[app.name] = digest.hexdigest()
+        return _fingerprints[app.name]
+
+def view_etag(*parts):
+    """ETag for a page rendered for the current user from `parts`
+
+    Besides the caller's validator it covers the URL, the viewer (pages
+    show their name and permission-dependent links), the display timezone
+    and the deployment, none of which cost a query.
+    """
+    key = [
+        deployment_fingerprint(), request.full_path, current_user.get_id(),
+        current_user.permission_mask, settings_cache.get().timezone, *parts
+    ]
+    return hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+
+def conditional_view(validator):
+    """Answer revalidating GETs with 304 Not Modified before doing any work
+
+    `validator` receives the view's arguments and returns a tuple that
+    changes whenever the page would, or None to serve the request
+    unconditionally. It runs before the view, so it must also return None
+    when the viewer may not see the page. Only 200 responses are tagged;
+    they are sent with `Cache-Control: private, no-cache` so browsers keep
+    them but check back on every use.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # A page rendered now would also show the pending flash messages
+            if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                return f(*args, **kwargs)
+            parts = validator(*args, **kwargs)
+            if parts is None:
+                return f(*args, **kwargs)
+
+            etag = view_etag(*parts)
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            return response
+        return decorated_function
+    return decorator
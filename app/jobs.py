@@ -0,0 +1,184 @@
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from app import db
+from app.models import ReportJob
+from app.archive import record_model_of
+from app.reports import REPORT_LAYOUT_VERSION, report_records_query, report_download_name, build_report_pdf
+from app.storage import read_only
+from app.write_queue import write_queue
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor(app):
+    """Return the process-wide worker pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('REPORT_JOB_WORKERS', 2),
+                thread_name_prefix='report-job'
+            )
+    return _executor
+
+def get_report_cache_dir(app=None):
+    app = app or current_app
+    cache_dir = app.config.get('REPORT_CACHE_DIR') or os.path.join(app.instance_path, 'report_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def _cache_prefix(kind, subject_id, start_date, end_date):
+    return f"v{REPORT_LAYOUT_VERSION}_{kind}_{subject_id}_{start_date or 'all'}_{end_date or 'all'}_"
+
+def report_cache_path(kind, subject_id, start_date, end_date, latest_record_id):
+    """On-disk location of a rendered report for the given cache key"""
+    filename = _cache_prefix(kind, subject_id, start_date, end_date) + f"{latest_record_id or 0}.pdf"
+    return os.path.join(get_report_cache_dir(), filename)
+
+def _prune_stale_cache(kind, subject_id, start_date, end_date, keep_path):
+    """Remove older renders of the same report once a newer one exists"""
+    cache_dir = os.path.dirname(keep_path)
+    prefix = _cache_prefix(kind, subject_id, start_date, end_date)
+    for filename in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, filename)
+        if filename.startswith(prefix) and filename.endswith('.pdf') and path != keep_path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _is_stale(job):
+    timeout = current_app.config.get('REPORT_JOB_TIMEOUT', 600)
+    return job.created_at < datetime.utcnow() - timedelta(seconds=timeout)
+
+# Job rows are written through the write queue like every other write.
+# These run on its thread, in its session, so they take ids, not objects;
+# callers reload the row afterwards.
+
+def _add_job(**fields):
+    db.session.add(ReportJob(**fields))
+
+def _update_job(job_id, **fields):
+    job = db.session.get(ReportJob, job_id)
+    if job is not None:
+        for name, value in fields.items():
+            setattr(job, name, value)
+
+def _time_out_jobs(job_ids):
+    for job_id in job_ids:
+        _update_job(job_id, status='failed', error='Job timed out', finished_at=datetime.utcnow())
+
+def enqueue_report_job(kind, subject_id, start_date=None, end_date=None, requested_by=None):
+    """Return a job for the report, reusing a cached render or in-flight job if possible
+
+    Dates must already be validated. The cache key is (kind, subject, date
+    range, latest matching record id), so a new record in range invalidates it.
+    """
+    query = report_records_query(kind, subject_id, start_date, end_date)
+    latest_record_id = query.with_entities(func.max(record_model_of(query).id)).scalar()
+
+    existing_jobs = ReportJob.query.filter_by(
+        kind=kind,
+        subject_id=subject_id,
+        start_date=start_date,
+        end_date=end_date,
+        latest_record_id=latest_record_id
+    ).filter(
+        ReportJob.status.in_(['queued', 'running', 'done'])
+    ).order_by(ReportJob.created_at.desc()).all()
+
+    stale_job_ids = []
+    for job in existing_jobs:
+        if job.status == 'done':
+            if job.file_path and os.path.exists(job.file_path):
+                return job
+        elif not _is_stale(job):
+            return job
+        else:
+            stale_job_ids.append(job.id)
+    if stale_job_ids:
+        write_queue.run(_time_out_jobs, stale_job_ids)
+
+    fields = dict(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        subject_id=subject_id,
+        start_date=start_date,
+        end_date=end_date,
+        latest_record_id=latest_record_id,
+        requested_by=requested_by
+    )
+
+    # A previous job may have rendered this key before its row was cleaned up
+    cache_path = report_cache_path(kind, subject_id, start_date, end_date, latest_record_id)
+    if os.path.exists(cache_path):
+        write_queue.run(
+            _add_job, **fields, status='done', file_path=cache_path,
+            download_name=report_download_name(kind, subject_id, start_date, end_date),
+            finished_at=datetime.utcnow()
+        )
+        return db.session.get(ReportJob, fields['id'])
+
+    write_queue.run(_add_job, **fields, status='queued')
+
+    app = current_app._get_current_object()
+    _get_executor(app).submit(_run_report_job, app, fields['id'])
+    return db.session.get(ReportJob, fields['id'])
+
+def _run_report_job(app, job_id):
+    """Render a queued report inside the worker pool"""
+    with app.app_context():
+        try:
+            job = db.session.get(ReportJob, job_id)
+            if job is None or job.status != 'queued':
+                return
+            write_queue.run(_update_job, job_id, status='running')
+
+            with read_only():
+                pdf_bytes, download_name = build_report_pdf(
+                    job.kind, job.subject_id, job.start_date, job.end_date,
+                    max_record_id=job.latest_record_id or 0
+                )
+
+            cache_path = report_cache_path(
+                job.kind, job.subject_id, job.start_date, job.end_date, job.latest_record_id
+            )
+            tmp_path = f"{cache_path}.{job_id}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, cache_path)
+            _prune_stale_cache(job.kind, job.subject_id, job.start_date, job.end_date, cache_path)
+
+            write_queue.run(
+                _update_job, job_id, status='done', file_path=cache_path,
+                download_name=download_name, finished_at=datetime.utcnow()
+            )
+            app.logger.info(f"Report job {job_id} finished")
+
+        except Exception as e:
+            app.logger.exception(f"Report job {job_id} failed: {str(e)}")
+            db.session.rollback()
+            try:
+                write_queue.run(
+                    _update_job, job_id, status='failed', error=str(e), finished_at=datetime.utcnow()
+                )
+            except Exception as write_error:
+                # Left queued or running; readers time it out
+                app.logger.error(f"Could not mark report job {job_id} failed: {str(write_error)}")
+        finally:
+            db.session.remove()
+
+def get_report_job(job_id):
+    """Fetch a job, failing it if its worker has gone away"""
+    job = db.session.get(ReportJob, job_id)
+    if job and job.status in ('queued', 'running') and _is_stale(job):
+        write_queue.run(_time_out_jobs, [job_id])
+        db.session.refresh(job)
+    return job
@@ -0,0 +1,395 @@
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import Boolean, Integer, String, column, create_engine, inspect, select, table, text, func
+from sqlalchemy.schema import CreateTable
+
+from app import db
+from app.permissions import compile_permissions
+from app.models import (
+    User, Role, SchemaVersion, ChecklistRecord, ChecklistNotes, CompletedItem,
+    ChecklistItem, UserChecklist, ChecklistDailyStats, Client
+)
+from app.rollups import _dialect_insert, rebuild_daily_stats
+from app.archive import ARCHIVE_MODELS
+
+POWER_USER_PERMISSIONS = [
+    'manage_clients',
+    'view_reports',
+    'edit_checklist_structure',
+    'add_template',
+    'add_client',
+    'delete_category',
+    'add_category',
+    'add_client_template'
+]
+
+MIGRATIONS = []
+
+def migration(version, name):
+    """Register a schema step; steps run once each, in version order"""
+    def decorator(f):
+        MIGRATIONS.append((version, name, f))
+        MIGRATIONS.sort(key=lambda step: step[0])
+        return f
+    return decorator
+
+def _batch_size():
+    return current_app.config.get('MIGRATION_BATCH_SIZE', 5000)
+
+def _has_column(table, column):
+    return column in {c['name'] for c in inspect(db.engine).get_columns(table)}
+
+def _add_column(table, column, ddl, progress):
+    if _has_column(table, column):
+        return
+    db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+    db.session.commit()
+    progress(f"  added {table}.{column}")
+
+def _id_ranges(model, batch_size):
+    """Consecutive (low, high) primary key ranges covering the whole table"""
+    low, high = db.session.query(func.min(model.id), func.max(model.id)).one()
+    if low is None:
+        return
+    for start in range(low, high + 1, batch_size):
+        yield start, min(start + batch_size - 1, high), high
+
+# The role table as step 1 knows it; the Role model has since gained
+# columns that only later steps add
+_base_role = table(
+    'role',
+    column('id', Integer),
+    column('name', String),
+    column('is_custom', Boolean),
+    column('permissions', Role.__table__.c.permissions.type)
+)
+
+@migration(1, 'base schema')
+def _base_schema(progress):
+    db.create_all()
+    _add_column('checklist_category', 'is_per_user', 'BOOLEAN DEFAULT FALSE', progress)
+
+    power_user = select(_base_role.c.id).where(_base_role.c.name == 'Power User')
+    if db.session.execute(power_user).first() is None:
+        db.session.execute(_base_role.insert().values(
+            name='Power User', is_custom=False, permissions=POWER_USER_PERMISSIONS
+        ))
+        db.session.commit()
+        progress("  created Power User role")
+
+@migration(2, 'checklist record item counts')
+def _record_counts(progress):
+    for column in ('completed_item_count', 'total_item_count'):
+        _add_column('checklist_record', column, 'INTEGER', progress)
+
+    for low, high, last in _id_ranges(ChecklistRecord, _batch_size()):
+        db.session.execute(text('''
+            UPDATE checklist_record SET
+                completed_item_count = (
+                    SELECT COUNT(*) FROM completed_items
+                    WHERE completed_items.record_id = checklist_record.id
+                    AND completed_items.completed
+                ),
+                total_item_count = (
+                    SELECT COUNT(*) FROM completed_items
+                    WHERE completed_items.record_id = checklist_record.id
+                )
+            WHERE id BETWEEN :low AND :high
+            AND (completed_item_count IS NULL OR total_item_count IS NULL)
+        '''), {'low': low, 'high': high})
+        db.session.commit()
+        progress(f"  counted items for records up to {high} of {last}")
+
+@migration(3, 'submission keys')
+def _submission_keys(progress):
+    _add_column('checklist_record', 'submission_key', 'VARCHAR(64)', progress)
+    db.session.execute(text(
+        'CREATE UNIQUE INDEX IF NOT EXISTS ix_checklist_record_submission_key '
+        'ON checklist_record (submission_key)'
+    ))
+    db.session.commit()
+
+@migration(4, 'drop unchecked completed items')
+def _compact_completed_items(progress):
+    # Relies on step 2 having captured the totals these rows make up
+    deleted = 0
+    while True:
+        result = db.session.execute(text('''
+            DELETE FROM completed_items WHERE id IN (
+                SELECT id FROM completed_items
+                WHERE completed IS NULL OR NOT completed
+                LIMIT :batch_size
+            )
+        '''), {'batch_size': _batch_size()})
+        db.session.commit()
+        if not result.rowcount:
+            break
+        deleted += result.rowcount
+        progress(f"  removed {deleted} unchecked item rows")
+
+@migration(5, 'daily rollups')
+def _daily_rollups(progress):
+    if db.session.query(ChecklistDailyStats.id).first() is None:
+        # The archive tables only arrive in step 7
+        rows = rebuild_daily_stats(include_archive=False)
+        db.session.commit()
+        progress(f"  built {rows} daily rollup rows")
+
+@migration(6, 'query indexes')
+def _query_indexes(progress):
+    with db.engine.begin() as conn:
+        for model in (ChecklistRecord, ChecklistNotes, CompletedItem, ChecklistItem, UserChecklist):
+            for index in model.__table__.indexes:
+                index.create(conn, checkfirst=True)
+        # Refresh planner statistics so the new indexes are chosen
+        conn.execute(text('ANALYZE'))
+
+@migration(7, 'archive tables')
+def _archive_tables(progress):
+    # Creates the archived_* tables and their indexes
+    db.create_all()
+
+@migration(8, 'permission bitmasks')
+def _permission_masks(progress):
+    _add_column('role', 'permission_mask', 'INTEGER NOT NULL DEFAULT 0', progress)
+    for role in Role.query.all():
+        role.permission_mask = compile_permissions(role.permissions)
+    db.session.commit()
+
+    with db.engine.begin() as conn:
+        for index in User.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+@migration(9, 'client structure versions')
+def _structure_versions(progress):
+    _add_column('client', 'structure_version', 'INTEGER NOT NULL DEFAULT 0', progress)
+
+def _rebuild_with_autoincrement(model, floor_model, progress):
+    """Recreate a SQLite table with AUTOINCREMENT so deleted ids are never reused
+
+    SQLite cannot add AUTOINCREMENT to an existing table, so the table is
+    copied into a new one. The id sequence starts past the highest id in
+    `floor_model`'s table as well.
+    """
+    table = model.__table__
+    sql = db.session.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': table.name}
+    ).scalar()
+    db.session.commit()
+    if sql is None or 'AUTOINCREMENT' in sql.upper():
+        return
+
+    rebuilt = f"{table.name}_rebuild"
+    columns = ', '.join(column.name for column in table.columns)
+    create = str(CreateTable(table).compile(db.engine)).strip()
+    with db.engine.begin() as conn:
+        conn.execute(text(create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {rebuilt} ", 1)))
+        conn.execute(text(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table.name}"))
+        conn.execute(text(f"DROP TABLE {table.name}"))
+        conn.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {table.name}"))
+        for index in table.indexes:
+            index.create(conn)
+
+        floor = conn.execute(select(func.max(floor_model.id))).scalar() or 0
+        conn.execute(text(
+            "INSERT INTO sqlite_sequence (name, seq) SELECT :name, 0 "
+            "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"
+        ), {'name': table.name})
+        conn.execute(text(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, :floor) WHERE name = :name"
+        ), {'name': table.name, 'floor': floor})
+    progress(f"  rebuilt {table.name} with AUTOINCREMENT (next id > {floor})")
+
+@migration(10, 'monotonic record ids')
+def _monotonic_record_ids(progress):
+    # PostgreSQL sequences never go backwards; only SQLite reuses ids
+    if db.engine.dialect.name != 'sqlite':
+        return
+    for hot, cold, _ in ARCHIVE_MODELS:
+        _rebuild_with_autoincrement(hot, cold, progress)
+
+@migration(11, 'monotonic client ids')
+def _monotonic_client_ids(progress):
+    if db.engine.dialect.name != 'sqlite':
+        return
+    _rebuild_with_autoincrement(Client, Client, progress)
+
+def _ensure_version_table():
+    SchemaVersion.__table__.create(db.engine, checkfirst=True)
+
+def current_version():
+    _ensure_version_table()
+    return db.session.query(func.max(SchemaVersion.version)).scalar() or 0
+
+def pending_migrations():
+    version = current_version()
+    return [step for step in MIGRATIONS if step[0] > version]
+
+def run_migrations(progress=print):
+    """Apply every pending step, recording each in schema_version as it completes
+
+    Returns the list of (version, name) pairs applied.
+    """
+    applied = []
+    for version, name, step in pending_migrations():
+        started = time.monotonic()
+        progress(f"Applying {version:03d} {name}...")
+        try:
+            step(progress)
+            db.session.add(SchemaVersion(version=version, name=name))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        progress(f"Applied {version:03d} {name} in {time.monotonic() - started:.1f}s")
+        applied.append((version, name))
+    return applied
+
+def stamp_current_version():
+    """Mark every step as applied; for databases just built by create_all"""
+    _ensure_version_table()
+    applied = {version for (version,) in db.session.query(SchemaVersion.version)}
+    for version, name, _ in MIGRATIONS:
+        if version not in applied:
+            db.session.add(SchemaVersion(version=version, name=name))
+    db.session.commit()
+
+def backup_sqlite_database(suffix=None):
+    """Copy the SQLite database next to itself; returns the backup path
+
+    Uses SQLite's online backup API, which includes pages still in the WAL
+    that a plain file copy would miss.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return None
+    path = db.engine.url.database
+    suffix = suffix or datetime.now().strftime('%Y%m%d_%H%M%S')
+    root, ext = os.path.splitext(path)
+    backup_path = f"{root}_backup_{suffix}{ext}"
+
+    source = sqlite3.connect(path)
+    target = sqlite3.connect(backup_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return backup_path
+
+# Tables and columns of the pre-role schema that migrate_db.py carried over
+LEGACY_TABLES = [
+    ('user', ['id', 'username', 'password_hash', 'is_admin']),
+    ('client', ['id', 'name', 'is_active']),
+    ('checklist_template', ['id', 'name', 'is_default']),
+    ('checklist_category', ['id', 'name', 'template_id']),
+    ('template_item', ['id', 'description', 'category_id', 'template_id']),
+    ('checklist_item', ['id', 'client_id', 'description', 'category_id']),
+    ('settings', ['id', 'timezone']),
+]
+
+def import_legacy_database(path, progress=print):
+    """Copy rows from an old-schema SQLite file, keeping existing rows
+
+    Rows are streamed with fetchmany and written with one executemany per
+    batch, each batch in its own transaction.
+    """
+    batch_size = _batch_size()
+    insert = _dialect_insert()
+    source = sqlite3.connect(path)
+    try:
+        for table_name, columns in LEGACY_TABLES:
+            table = db.metadata.tables[table_name]
+            cursor = source.cursor()
+            try:
+                cursor.execute(f"SELECT {', '.join(columns)} FROM {table_name} ORDER BY id")
+            except sqlite3.OperationalError:
+                progress(f"  {table_name}: not present, skipped")
+                continue
+
+            # SQLite hands booleans back as 0/1
+            booleans = [isinstance(table.c[column].type, Boolean) for column in columns]
+            copied = 0
+            statement = insert(table).on_conflict_do_nothing(index_elements=['id'])
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                db.session.execute(statement, [
+                    {
+                        column: bool(value) if is_bool and value is not None else value
+                        for column, value, is_bool in zip(columns, row, booleans)
+                    }
+                    for row in rows
+                ])
+                db.session.commit()
+                copied += len(rows)
+                progress(f"  {table_name}: {copied} rows")
+    finally:
+        source.close()
+
+    reset_sequences(db.engine)
+
+def reset_sequences(engine):
+    """Move PostgreSQL id sequences past rows inserted with explicit ids"""
+    if engine.dialect.name != 'postgresql':
+        return
+    quote = engine.dialect.identifier_preparer.quote
+    # Archived rows keep their ids, so hot sequences must also pass those
+    archive_of = {hot.__table__: cold.__table__ for hot, cold, _ in ARCHIVE_MODELS}
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            pk = list(table.primary_key.columns)
+            if len(pk) != 1 or not isinstance(pk[0].type, Integer) or pk[0].autoincrement is False:
+                continue
+            table_name, column = quote(table.name), quote(pk[0].name)
+            source = f"SELECT {column} FROM {table_name}"
+            if table in archive_of:
+                source += f" UNION ALL SELECT {column} FROM {quote(archive_of[table].name)}"
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence(:table, :column), "
+                f"COALESCE(MAX({column}), 1), MAX({column}) IS NOT NULL) FROM ({source}) AS ids"
+            ), {'table': table_name, 'column': pk[0].name})
+
+def copy_database(source_uri, progress=print):
+    """Copy every table from `source_uri` into the app's (empty) database
+
+    The source must be at the current schema version. Tables are copied
+    parent-first; rows are streamed in MIGRATION_BATCH_SIZE batches, each
+    written with one executemany in its own transaction.
+    """
+    batch_size = _batch_size()
+    source_engine = create_engine(source_uri)
+    target_engine = db.engine
+    try:
+        with source_engine.connect() as source:
+            source_version = source.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+            if source_version != MIGRATIONS[-1][0]:
+                raise RuntimeError(
+                    f"Source schema is at version {source_version}; run migrate.py against it first"
+                )
+
+            db.metadata.create_all(target_engine)
+            with target_engine.connect() as target:
+                for table in db.metadata.sorted_tables:
+                    if target.execute(select(func.count()).select_from(table)).scalar():
+                        raise RuntimeError(f"Target table {table.name} is not empty")
+
+            for table in db.metadata.sorted_tables:
+                result = source.execution_options(yield_per=batch_size).execute(
+                    select(table).order_by(*table.primary_key.columns)
+                )
+                copied = 0
+                for rows in result.partitions():
+                    with target_engine.begin() as target:
+                        target.execute(table.insert(), [dict(row._mapping) for row in rows])
+                    copied += len(rows)
+                    progress(f"  {table.name}: {copied} rows")
+    finally:
+        source_engine.dispose()
+
+    reset_sequences(target_engine)
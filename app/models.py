@@ -3,13 +3,16 @@ from flask_login import UserMixin
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import event, UniqueConstraint
+from sqlalchemy.orm import validates
+from sqlalchemy.dialects.postgresql import JSONB
+from app.permissions import ALL_PERMISSIONS, compile_permissions, permission_bit
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
-    role_id = db.Column(db.Integer, db.ForeignKey('role.id'))
+    role_id = db.Column(db.Integer, db.ForeignKey('role.id'), index=True)
     checklist_records = db.relationship('ChecklistRecord', backref='user')
 
     def set_password(self, password):
@@ -22,23 +25,40 @@ class User(UserMixin, db.Model):
     def is_power_user(self):
         return self.role is not None and self.role.name == 'Power User'
 
-    def has_permission(self, permission):
+    @property
+    def permission_mask(self):
         if self.is_admin:
-            return True
-        if self.role and self.role.permissions:
-            return permission in self.role.permissions
-        return False
+            return ALL_PERMISSIONS
+        if self.role:
+            return self.role.permission_mask or 0
+        return 0
+
+    def has_permission(self, permission):
+        return bool(self.permission_mask & permission_bit(permission))
 
 class Client(db.Model):
+    # Per-process caches are keyed on client ids; a new client must never
+    # inherit a deleted one's
+    __table_args__ = {'sqlite_autoincrement': True}
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
     is_active = db.Column(db.Boolean, default=True)
+    # Bumped with every change to the client's checklist structure; see
+    # ChecklistStructureCache
+    structure_version = db.Column(db.Integer, nullable=False, default=0)
     checklist_records = db.relationship('ChecklistRecord', backref='client', cascade='all, delete-orphan')
     checklists = db.relationship('ClientChecklist', backref='client', cascade='all, delete-orphan')
     checklist_items = db.relationship('ChecklistItem', backref='client', cascade='all, delete-orphan')
     users = db.relationship('ClientUser', backref='client', cascade='all, delete-orphan')
+    daily_stats = db.relationship('ChecklistDailyStats', backref='client', cascade='all, delete-orphan')
 
 class ChecklistItem(db.Model):
+    __table_args__ = (
+        # Checklist page: a client's items per category
+        db.Index('ix_checklist_item_client_category', 'client_id', 'category_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('client.id'))
     description = db.Column(db.String(200), nullable=False)
@@ -47,24 +67,43 @@ class ChecklistItem(db.Model):
     completed = db.Column(db.Boolean, default=False)
 
 class ChecklistRecord(db.Model):
+    __table_args__ = (
+        # Client and technician reports filter by owner and date range
+        db.Index('ix_checklist_record_client_date', 'client_id', 'date_performed'),
+        db.Index('ix_checklist_record_user_date', 'user_id', 'date_performed'),
+        # Never hand out an id again once it is deleted or archived: archived
+        # rows keep their ids, and caches are keyed on them
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('client.id'))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     date_performed = db.Column(db.DateTime, default=datetime.utcnow)
+    # Written by submit_checklist; NULL only for rows not yet backfilled
+    completed_item_count = db.Column(db.Integer)
+    total_item_count = db.Column(db.Integer)
+    # Client-generated key that makes retried submissions idempotent
+    submission_key = db.Column(db.String(64), unique=True, index=True)
     items = db.relationship('ChecklistItem', backref='record', lazy='dynamic')
     notes = db.relationship('ChecklistNotes', backref='record', lazy='dynamic')
     user_checklists = db.relationship('UserChecklist', backref='record', lazy='dynamic')
 
-
-
     @property
     def completed_count(self):
+        if self.completed_item_count is not None:
+            return self.completed_item_count
         return CompletedItem.query.filter_by(
             record_id=self.id,
             completed=True
         ).count()
 
 class ChecklistNotes(db.Model):
+    __table_args__ = (
+        db.Index('ix_checklist_notes_record', 'checklist_record_id'),
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     checklist_record_id = db.Column(db.Integer, db.ForeignKey('checklist_record.id'))
     note_text = db.Column(db.Text, nullable=False)
@@ -76,6 +115,8 @@ class CompletedItem(db.Model):
     __tablename__ = 'completed_items'
     __table_args__ = (
         UniqueConstraint('record_id', 'checklist_item_id', name='uix_record_item'),
+        db.Index('ix_completed_items_record_completed', 'record_id', 'completed'),
+        {'sqlite_autoincrement': True},
     )
     
     id = db.Column(db.Integer, primary_key=True)
@@ -118,18 +159,26 @@ class Settings(db.Model):
 
     @staticmethod
     def get_timezone():
-        settings = Settings.query.first()
-        return settings.timezone if settings else 'UTC'
+        from app.cache import settings_cache
+        return settings_cache.get().timezone
 
 class Role(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=True, nullable=False)
     is_custom = db.Column(db.Boolean, default=True)
-    permissions = db.Column(db.JSON)
     users = db.relationship('User', backref='role', lazy=True)
     
-    # Store permissions as a JSON string
-    permissions = db.Column(db.JSON)
+    # Store permissions as a JSON list; JSONB on PostgreSQL so the column
+    # supports equality (plain json cannot be compared, grouped or DISTINCTed)
+    permissions = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'))
+    # Bitmask compiled from `permissions` (see app/permissions.py); kept in
+    # step by assigning `permissions`
+    permission_mask = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    @validates('permissions')
+    def _compile_permissions(self, key, permissions):
+        self.permission_mask = compile_permissions(permissions)
+        return permissions
 
 class ClientUser(db.Model):
     __tablename__ = 'client_user'
@@ -144,6 +193,11 @@ class ClientUser(db.Model):
     )
 
 class UserChecklist(db.Model):
+    __table_args__ = (
+        db.Index('ix_user_checklist_record', 'record_id'),
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     record_id = db.Column(db.Integer, db.ForeignKey('checklist_record.id', ondelete='CASCADE'))
     category_id = db.Column(db.Integer, db.ForeignKey('checklist_category.id', ondelete='CASCADE'))
@@ -161,4 +215,103 @@ class ClientCategorySettings(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('client_id', 'category_id', name='uix_client_category'),
-    )
\ No newline at end of file
+    )
+class ReportJob(db.Model):
+    __tablename__ = 'report_job'
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'client' or 'user'
+    subject_id = db.Column(db.Integer, nullable=False)
+    start_date = db.Column(db.String(10))
+    end_date = db.Column(db.String(10))
+    latest_record_id = db.Column(db.Integer)
+    status = db.Column(db.String(20), default='queued')  # queued, running, done, failed
+    file_path = db.Column(db.String(500))
+    download_name = db.Column(db.String(200))
+    error = db.Column(db.Text)
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+
+class ChecklistDailyStats(db.Model):
+    """Checklist activity per day, client and technician, kept in step by submit_checklist"""
+    __tablename__ = 'checklist_daily_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id', ondelete='CASCADE'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    check_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_item_count = db.Column(db.Integer, nullable=False, default=0)
+    user = db.relationship('User', backref='daily_stats')
+
+    __table_args__ = (
+        db.UniqueConstraint('day', 'client_id', 'user_id', name='uix_daily_stats_day_client_user'),
+    )
+
+
+class SchemaVersion(db.Model):
+    """One row per migration step applied by migrate.py"""
+    __tablename__ = 'schema_version'
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# Cold storage for old checklists. Each table has the same columns as its hot
+# counterpart and keeps the original ids; app/archive.py moves rows across
+# and reads both sides when a query reaches back past the cutoff.
+
+class ArchivedChecklistRecord(db.Model):
+    __tablename__ = 'archived_checklist_record'
+    __table_args__ = (
+        db.Index('ix_archived_checklist_record_client_date', 'client_id', 'date_performed'),
+        db.Index('ix_archived_checklist_record_user_date', 'user_id', 'date_performed'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    date_performed = db.Column(db.DateTime, index=True)
+    completed_item_count = db.Column(db.Integer)
+    total_item_count = db.Column(db.Integer)
+    submission_key = db.Column(db.String(64))
+
+class ArchivedChecklistNotes(db.Model):
+    __tablename__ = 'archived_checklist_notes'
+    __table_args__ = (
+        db.Index('ix_archived_checklist_notes_record', 'checklist_record_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    checklist_record_id = db.Column(db.Integer, db.ForeignKey('archived_checklist_record.id', ondelete='CASCADE'))
+    note_text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+
+class ArchivedCompletedItem(db.Model):
+    __tablename__ = 'archived_completed_items'
+    __table_args__ = (
+        db.Index('ix_archived_completed_items_record_completed', 'record_id', 'completed'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    record_id = db.Column(db.Integer, db.ForeignKey('archived_checklist_record.id', ondelete='CASCADE'))
+    checklist_item_id = db.Column(db.Integer, db.ForeignKey('checklist_item.id', ondelete='CASCADE'))
+    completed = db.Column(db.Boolean)
+    completed_at = db.Column(db.DateTime)
+    completed_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+
+class ArchivedUserChecklist(db.Model):
+    __tablename__ = 'archived_user_checklist'
+    __table_args__ = (
+        db.Index('ix_archived_user_checklist_record', 'record_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    record_id = db.Column(db.Integer, db.ForeignKey('archived_checklist_record.id', ondelete='CASCADE'))
+    category_id = db.Column(db.Integer, db.ForeignKey('checklist_category.id', ondelete='CASCADE'))
+    client_user_id = db.Column(db.Integer, db.ForeignKey('client_user.id', ondelete='CASCADE'))
+    created_at = db.Column(db.DateTime)
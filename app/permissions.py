@@ -0,0 +1,34 @@
+# Registry of named permissions. A role's permissions are compiled into
+# role.permission_mask using these bit positions, so only ever append.
+PERMISSIONS = [
+    'manage_clients',
+    'view_reports',
+    'edit_checklist_structure',
+    'add_template',
+    'add_client',
+    'delete_category',
+    'add_category',
+    'add_client_template',
+    'manage_users',
+    'manage_templates',
+    'system_settings',
+]
+
+PERMISSION_BITS = {name: 1 << position for position, name in enumerate(PERMISSIONS)}
+
+ALL_PERMISSIONS = (1 << len(PERMISSIONS)) - 1
+
+def permission_bit(name):
+    """Bit for a permission name; 0 for names that are not registered"""
+    return PERMISSION_BITS.get(name, 0)
+
+def compile_permissions(names):
+    """Fold a list of permission names into a bitmask, ignoring unknown names"""
+    mask = 0
+    for name in names or ():
+        mask |= permission_bit(name)
+    return mask
+
+def permission_names(mask):
+    """Inverse of compile_permissions"""
+    return [name for name in PERMISSIONS if mask & PERMISSION_BITS[name]]
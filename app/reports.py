@@ -0,0 +1,632 @@
+from app import db
+from app.models import (
+    User,
+    Client,
+    ChecklistItem,
+    ChecklistRecord,
+    CompletedItem,
+    ChecklistCategory,
+    ChecklistNotes,
+    ClientUser,
+    UserChecklist
+    )
+import base64
+import hashlib
+import os
+import threading
+import csv
+import json
+from io import StringIO
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import joinedload, aliased
+
+from app.archive import archived_through, detail_model, record_model, record_model_of
+
+from io import BytesIO
+from reportlab.lib.units import mm
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # Without pypdf every export renders all records from scratch
+    PdfReader = PdfWriter = None
+
+# Bump when the PDF layout changes so cached reports and record pages are re-rendered
+REPORT_LAYOUT_VERSION = 1
+
+def create_pdf_styles():
+    """Create and return custom PDF styles"""
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=30
+    )
+    
+    heading2_style = ParagraphStyle(
+        'CustomHeading2',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12
+    )
+    
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontSize=10,
+        leading=14
+    )
+    
+    return {
+        'title': title_style,
+        'heading2': heading2_style,
+        'normal': normal_style
+    }
+
+# SQLite builds older than 3.32 cap bound parameters at 999 per statement
+PREFETCH_BATCH_SIZE = 900
+
+def _chunked(values, size=PREFETCH_BATCH_SIZE):
+    """Yield successive slices of at most `size` values"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def prefetch_record_data(record_ids):
+    """Load category, user and note data for many records in a fixed number of queries
+
+    Returns a dict with 'categories' (record id -> category data, in the shape
+    produced by get_category_data) and 'notes' (record id -> ChecklistNotes).
+    """
+    record_ids = list(record_ids)
+    categories_by_record = {record_id: {} for record_id in record_ids}
+    notes_by_record = {}
+
+    # Some of the records may have been moved to the archive tables
+    include_archive = archived_through() is not None
+    completed_model = detail_model(CompletedItem, include_archive)
+    user_checklist_model = detail_model(UserChecklist, include_archive)
+    notes_model = detail_model(ChecklistNotes, include_archive)
+
+    for chunk in _chunked(record_ids):
+        completed_items = db.session.query(
+            completed_model.record_id, completed_model.completed,
+            ChecklistItem.description, ChecklistCategory
+        ).join(
+            ChecklistItem, completed_model.checklist_item_id == ChecklistItem.id
+        ).join(
+            ChecklistCategory, ChecklistItem.category_id == ChecklistCategory.id
+        ).filter(
+            completed_model.record_id.in_(chunk)
+        ).order_by(completed_model.record_id, completed_model.id).all()
+
+        for record_id, completed, description, category in completed_items:
+            categories_data = categories_by_record[record_id]
+            if category not in categories_data:
+                categories_data[category] = {
+                    'items': [],
+                    'users': []
+                }
+            if completed:
+                categories_data[category]['items'].append(description)
+
+        user_checklists = db.session.query(
+            user_checklist_model.record_id, ChecklistCategory, ClientUser.name
+        ).join(
+            ClientUser, user_checklist_model.client_user_id == ClientUser.id
+        ).join(
+            ChecklistCategory, user_checklist_model.category_id == ChecklistCategory.id
+        ).filter(
+            user_checklist_model.record_id.in_(chunk)
+        ).order_by(user_checklist_model.id).all()
+
+        # Only completed items are stored, so a category may appear here
+        # purely because users were selected for it
+        for record_id, category, client_user_name in user_checklists:
+            categories_data = categories_by_record[record_id]
+            if category not in categories_data:
+                categories_data[category] = {
+                    'items': [],
+                    'users': []
+                }
+            categories_data[category]['users'].append(client_user_name)
+
+        notes = db.session.query(notes_model).filter(
+            notes_model.checklist_record_id.in_(chunk)
+        ).order_by(notes_model.id).all()
+
+        for note in notes:
+            notes_by_record.setdefault(note.checklist_record_id, note)
+
+    return {
+        'categories': categories_by_record,
+        'notes': notes_by_record
+    }
+
+def get_category_data(record_id):
+    """Get completed items and user data organized by category"""
+    return prefetch_record_data([record_id])['categories'][record_id]
+
+def add_record_to_pdf(elements, record, styles, is_first_record=False, prefetched=None):
+    """Add a single record to the PDF elements list
+
+    Pass the result of prefetch_record_data as `prefetched` when adding many
+    records so no per-record queries are issued.
+    """
+    if prefetched is None:
+        prefetched = prefetch_record_data([record.id])
+
+    if not is_first_record:
+        elements.append(PageBreak())
+    
+    # Record header
+    elements.append(Paragraph(
+        f"Date: {record.date_performed.strftime('%Y-%m-%d %H:%M')}",
+        styles['heading2']
+    ))
+    elements.append(Paragraph(
+        f"Client: {record.client.name}",
+        styles['heading2']
+    ))
+    elements.append(Paragraph(
+        f"Performed by: {record.user.username}",
+        styles['heading2']
+    ))
+    
+    elements.append(Spacer(1, 12))
+    
+    # Get category data
+    categories_data = prefetched['categories'].get(record.id, {})
+    
+    # Add categories and items
+    for category, data in categories_data.items():
+        elements.append(Paragraph(category.name, styles['heading2']))
+        
+        # Add selected users if any
+        if data['users']:
+            elements.append(Paragraph(
+                "Selected Users: " + ", ".join(data['users']),
+                styles['normal']
+            ))
+            elements.append(Spacer(1, 6))
+
+        # Add items
+        for item in data['items']:
+            elements.append(Paragraph(f"• {item}", styles['normal']))
+        elements.append(Spacer(1, 12))
+
+    # Add notes if any
+    notes = prefetched['notes'].get(record.id)
+    if notes and notes.note_text:
+        elements.append(Paragraph("Notes:", styles['heading2']))
+        note_paragraphs = notes.note_text.split('\n')
+        for para in note_paragraphs:
+            if para.strip():
+                elements.append(Paragraph(para, styles['normal']))
+        elements.append(Spacer(1, 12))
+
+    elements.append(Spacer(1, 20))
+
+
+def parse_date_range(start_date=None, end_date=None):
+    """Turn inclusive YYYY-MM-DD bounds into a [start, end) datetime range
+
+    Either bound may be None. Raises ValueError with a user-facing message
+    if either date is invalid.
+    """
+    start = end = None
+    if start_date:
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError("Invalid start date format")
+
+    if end_date:
+        try:
+            # Add one day to include the end date fully
+            end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        except ValueError:
+            raise ValueError("Invalid end date format")
+
+    return start, end
+
+def filter_records_by_date(query, start_date=None, end_date=None):
+    """Restrict a record query to an inclusive YYYY-MM-DD date range
+
+    Raises ValueError with a user-facing message if either date is invalid.
+    """
+    record = record_model_of(query)
+    start, end = parse_date_range(start_date, end_date)
+    if start:
+        query = query.filter(record.date_performed >= start)
+    if end:
+        query = query.filter(record.date_performed < end)
+    return query
+
+def report_records_query(kind, subject_id, start_date=None, end_date=None):
+    """Base record query for a 'client' or 'user' report
+
+    Selects ChecklistRecord objects; when the range reaches back into the
+    archive they come from both the hot and archive tables. Use
+    record_model_of() to refer to the selected entity's columns.
+    """
+    start, _ = parse_date_range(start_date, end_date)
+    record = record_model(start)
+    if kind == 'client':
+        query = db.session.query(record).filter(record.client_id == subject_id)
+    elif kind == 'user':
+        query = db.session.query(record).filter(record.user_id == subject_id)
+    else:
+        raise ValueError(f"Unknown report type: {kind}")
+    return filter_records_by_date(query, start_date, end_date)
+
+def report_version(kind, subject_id, start_date=None, end_date=None):
+    """(latest record id, record count) of a report's records
+
+    Records never change once submitted, so this moves exactly when a
+    record is added to or removed from the report.
+    """
+    query = report_records_query(kind, subject_id, start_date, end_date)
+    record = record_model_of(query)
+    return tuple(query.with_entities(func.max(record.id), func.count(record.id)).one())
+
+def report_download_name(kind, subject_id, start_date=None, end_date=None):
+    """Filename offered to the browser for a client or user report"""
+    if kind == 'client':
+        filename = f"{db.session.get(Client, subject_id).name}_checklist_report"
+    else:
+        filename = f"{db.session.get(User, subject_id).username}_report"
+
+    # Add date range if specified
+    if start_date and end_date:
+        filename += f"_{start_date}_to_{end_date}"
+    return filename + ".pdf"
+
+def _new_pdf_document(buffer):
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=20*mm,
+        leftMargin=20*mm,
+        topMargin=20*mm,
+        bottomMargin=20*mm
+    )
+
+def get_fragment_cache_dir(app=None):
+    app = app or current_app
+    cache_dir = app.config.get('RECORD_FRAGMENT_CACHE_DIR') or os.path.join(app.instance_path, 'record_fragments')
+    return os.path.join(cache_dir, f"v{REPORT_LAYOUT_VERSION}")
+
+def _fragment_path(cache_dir, record):
+    """Cache file of a record's fragment
+
+    Ids alone are not enough: SQLite hands out a deleted record's id again,
+    so the name also carries a digest of fields that identify the record.
+    """
+    identity = f"{record.id}|{record.client_id}|{record.user_id}|{record.date_performed.isoformat()}|{record.submission_key}"
+    digest = hashlib.sha256(identity.encode()).hexdigest()[:16]
+    # Shard by thousands so no single directory grows unbounded
+    return os.path.join(cache_dir, str(record.id // 1000), f"{record.id}-{digest}.pdf")
+
+def render_record_fragment(record, styles, prefetched):
+    """Render one record as a standalone PDF starting on a fresh page"""
+    buffer = BytesIO()
+    elements = []
+    add_record_to_pdf(elements, record, styles, is_first_record=True, prefetched=prefetched)
+    _new_pdf_document(buffer).build(elements)
+    return buffer.getvalue()
+
+def get_record_fragments(records, styles):
+    """Return the pre-rendered PDF pages of each record, rendering only cache misses
+
+    Submitted records never change, so a fragment stays valid until
+    REPORT_LAYOUT_VERSION is bumped.
+    """
+    cache_dir = get_fragment_cache_dir()
+    fragments = {}
+    missing = []
+
+    for record in records:
+        path = _fragment_path(cache_dir, record)
+        try:
+            with open(path, 'rb') as f:
+                fragments[record.id] = f.read()
+        except OSError:
+            missing.append(record)
+
+    if missing:
+        prefetched = prefetch_record_data([record.id for record in missing])
+        for record in missing:
+            fragment = render_record_fragment(record, styles, prefetched)
+            fragments[record.id] = fragment
+
+            path = _fragment_path(cache_dir, record)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(fragment)
+            os.replace(tmp_path, path)
+
+    current_app.logger.info(f"Record fragments: {len(records) - len(missing)} cached, {len(missing)} rendered")
+    return [fragments[record.id] for record in records]
+
+def build_report_pdf(kind, subject_id, start_date=None, end_date=None, max_record_id=None):
+    """Render a client or user report and return (pdf bytes, download name)
+
+    `max_record_id` pins the record set so the output matches the cache key
+    it was requested under, even if new records arrive while rendering.
+    """
+    if kind == 'client':
+        title = f"Checklist Report - {db.session.get(Client, subject_id).name}"
+    else:
+        title = f"User Report - {db.session.get(User, subject_id).username}"
+
+    query = report_records_query(kind, subject_id, start_date, end_date)
+    record_model = record_model_of(query)
+    if max_record_id is not None:
+        query = query.filter(record_model.id <= max_record_id)
+
+    records = query.options(
+        joinedload(record_model.client),
+        joinedload(record_model.user)
+    ).order_by(record_model.date_performed.desc()).all()
+    current_app.logger.info(f"Rendering {kind} report for {subject_id} with {len(records)} records")
+
+    # The title page and first record share a page; later records each start
+    # on a new page and can be stitched in from the fragment cache
+    if PdfWriter is not None:
+        head_records, tail_records = records[:1], records[1:]
+    else:
+        head_records, tail_records = records, []
+    prefetched = prefetch_record_data([record.id for record in head_records])
+
+    # Create PDF
+    buffer = BytesIO()
+    doc = _new_pdf_document(buffer)
+
+    # Get styles
+    styles = create_pdf_styles()
+    
+    # Build document content
+    elements = []
+    
+    # Add title
+    if start_date and end_date:
+        title += f" ({start_date} to {end_date})"
+    elements.append(Paragraph(title, styles['title']))
+    
+    # Add report generation date
+    report_date = datetime.now().strftime("%Y-%m-%d %H:%M")
+    elements.append(Paragraph(f"Generated: {report_date}", styles['normal']))
+    elements.append(Spacer(1, 20))
+
+    # Add each record
+    for index, record in enumerate(head_records):
+        add_record_to_pdf(elements, record, styles, is_first_record=(index == 0), prefetched=prefetched)
+
+    # Build PDF
+    doc.build(elements)
+
+    if tail_records:
+        writer = PdfWriter()
+        writer.append(PdfReader(BytesIO(buffer.getvalue())))
+        for fragment in get_record_fragments(tail_records, styles):
+            writer.append(PdfReader(BytesIO(fragment)))
+        buffer = BytesIO()
+        writer.write(buffer)
+
+    return buffer.getvalue(), report_download_name(kind, subject_id, start_date, end_date)
+
+def encode_record_cursor(record):
+    """Opaque pagination cursor for a record's (date_performed, id) position"""
+    raw = f"{record.date_performed.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_record_cursor(cursor):
+    """Inverse of encode_record_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_part, id_part = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(date_part), int(id_part)
+    except Exception:
+        raise ValueError("Invalid page cursor")
+
+def past_cursor(record, date_performed, record_id, older=True):
+    """Filter for records past a (date_performed, id) position
+
+    Older records when `older`, newer ones otherwise. The plain bound on
+    date_performed lets the owner/date indexes start their range at the
+    cursor; the OR alone would only seek on the owner.
+    """
+    if older:
+        return and_(
+            record.date_performed <= date_performed,
+            or_(record.date_performed < date_performed, record.id < record_id)
+        )
+    return and_(
+        record.date_performed >= date_performed,
+        or_(record.date_performed > date_performed, record.id > record_id)
+    )
+
+def paginate_records(query, after=None, before=None, page_size=50):
+    """Keyset-paginate a ChecklistRecord query, newest first
+
+    `after` returns the page of older records following that cursor and
+    `before` the page of newer records preceding it. Each page seeks the
+    owner/date index to the cursor and reads forward from there, so deep
+    pages cost about the same as the first one. Records sharing the
+    cursor's timestamp are read past by id.
+    """
+    record = record_model_of(query)
+    if before:
+        query = query.filter(
+            past_cursor(record, *decode_record_cursor(before), older=False)
+        ).order_by(record.date_performed.asc(), record.id.asc())
+    else:
+        if after:
+            query = query.filter(past_cursor(record, *decode_record_cursor(after)))
+        query = query.order_by(record.date_performed.desc(), record.id.desc())
+
+    # Fetch one extra row to know whether another page exists
+    records = query.limit(page_size + 1).all()
+    has_more = len(records) > page_size
+    records = records[:page_size]
+
+    if before:
+        records.reverse()
+        has_newer, has_older = has_more, True
+    else:
+        has_newer, has_older = bool(after), has_more
+
+    return {
+        'records': records,
+        'next_cursor': encode_record_cursor(records[-1]) if records and has_older else None,
+        'prev_cursor': encode_record_cursor(records[0]) if records and has_newer else None
+    }
+
+EXPORT_COLUMNS = [
+    'record_id',
+    'date_performed',
+    'client',
+    'performed_by',
+    'category',
+    'item',
+    'completed',
+    'completed_by',
+    'completed_at',
+    'client_user'
+]
+
+def _export_detail_rows(record_ids, include_archive):
+    """Checked items and client user selections of some records, by record id"""
+    completed_item = detail_model(CompletedItem, include_archive)
+    user_checklist = detail_model(UserChecklist, include_archive)
+    completer = aliased(User)
+    items_by_record = {record_id: [] for record_id in record_ids}
+    selections_by_record = {record_id: [] for record_id in record_ids}
+
+    for chunk in _chunked(record_ids):
+        items = db.session.query(
+            completed_item.record_id, ChecklistItem.category_id, ChecklistCategory.id,
+            ChecklistCategory.name, ChecklistItem.description, completed_item.completed,
+            completer.username, completed_item.completed_at
+        ).outerjoin(
+            ChecklistItem, completed_item.checklist_item_id == ChecklistItem.id
+        ).outerjoin(
+            ChecklistCategory, ChecklistItem.category_id == ChecklistCategory.id
+        ).outerjoin(
+            completer, completed_item.completed_by == completer.id
+        ).filter(
+            completed_item.record_id.in_(chunk)
+        ).order_by(completed_item.record_id, completed_item.id)
+        for row in items:
+            items_by_record[row[0]].append(row[1:])
+
+        selections = db.session.query(
+            user_checklist.record_id, user_checklist.category_id,
+            ChecklistCategory.name, ClientUser.name
+        ).join(
+            ChecklistCategory, user_checklist.category_id == ChecklistCategory.id
+        ).outerjoin(
+            ClientUser, user_checklist.client_user_id == ClientUser.id
+        ).filter(
+            user_checklist.record_id.in_(chunk)
+        ).order_by(user_checklist.record_id, user_checklist.id)
+        for row in selections:
+            selections_by_record[row[0]].append(row[1:])
+
+    return items_by_record, selections_by_record
+
+def _export_record_rows(record_row, items, selections):
+    """One row per (item, selected client user) of a record
+
+    Only checked items are stored, so a per-user category can have
+    selected client users and no items; those selections get rows of
+    their own with no item. A record with nothing checked and nobody
+    selected still gets a single row.
+    """
+    record_id, date_performed, client, performed_by = record_row
+    users_by_category = {}
+    for category_id, _, client_user in selections:
+        users_by_category.setdefault(category_id, []).append(client_user)
+
+    rows = []
+    for (item_category_id, category_id, category, description,
+            completed, completed_by, completed_at) in items:
+        for client_user in users_by_category.get(category_id) or [None]:
+            rows.append((record_id, date_performed, client, performed_by, category,
+                         description, completed, completed_by, completed_at, client_user))
+
+    # Selections in categories with checked items are on those item rows
+    item_categories = {item[0] for item in items}
+    for category_id, category, client_user in selections:
+        if category_id not in item_categories:
+            rows.append((record_id, date_performed, client, performed_by, category,
+                         None, None, None, None, client_user))
+
+    if not items and not selections:
+        rows.append((record_id, date_performed, client, performed_by) + (None,) * 6)
+    return rows
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def iter_export_rows(query, batch_size=1000):
+    """Stream export rows for a record query as dicts, `batch_size` records at a time
+
+    Records are read newest first in keyset batches, each an index range
+    scan, and their items and selections are fetched by record id, so
+    nothing is sorted or held beyond one batch whatever the export's size.
+    """
+    technician = aliased(User)
+    record = record_model_of(query)
+    # Details come from the archive too whenever the records may
+    include_archive = record is not ChecklistRecord
+    records_query = query.with_entities(
+        record.id, record.date_performed, Client.name, technician.username
+    ).outerjoin(
+        Client, record.client_id == Client.id
+    ).outerjoin(
+        technician, record.user_id == technician.id
+    ).order_by(record.date_performed.desc(), record.id.desc())
+
+    batch_query = records_query
+    while True:
+        records = batch_query.limit(batch_size).all()
+        if not records:
+            return
+        items, selections = _export_detail_rows([row[0] for row in records], include_archive)
+        yield [
+            {column: _export_value(value) for column, value in zip(EXPORT_COLUMNS, row)}
+            for record_row in records
+            for row in _export_record_rows(record_row, items[record_row[0]], selections[record_row[0]])
+        ]
+        if len(records) < batch_size:
+            return
+        last_id, last_date = records[-1][0], records[-1][1]
+        batch_query = records_query.filter(past_cursor(record, last_date, last_id))
+
+def stream_csv_export(query, batch_size=1000):
+    """Yield CSV text chunks, one per batch, starting with the header row"""
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    for batch in iter_export_rows(query, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+def stream_ndjson_export(query, batch_size=1000):
+    """Yield newline-delimited JSON chunks, one per batch"""
+    for batch in iter_export_rows(query, batch_size):
+        yield ''.join(json.dumps(row) + '\n' for row in batch)
@@ -0,0 +1,103 @@
+from app import db
+from app.models import User, Client, ChecklistRecord, ChecklistDailyStats
+from app.archive import record_model
+from sqlalchemy import func
+
+def _dialect_insert():
+    """INSERT construct supporting ON CONFLICT for the active database"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+def record_checklist_rollup(record):
+    """Add a newly written record to the daily rollups
+
+    Runs inside the caller's transaction so the rollup commits or rolls back
+    together with the record itself.
+    """
+    table = ChecklistDailyStats.__table__
+    insert = _dialect_insert()
+
+    stmt = insert(table).values(
+        day=record.date_performed.date(),
+        client_id=record.client_id,
+        user_id=record.user_id,
+        check_count=1,
+        completed_item_count=record.completed_item_count or 0
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day', 'client_id', 'user_id'],
+        set_={
+            'check_count': table.c.check_count + 1,
+            'completed_item_count': table.c.completed_item_count + stmt.excluded.completed_item_count
+        }
+    )
+    db.session.execute(stmt)
+
+def rebuild_daily_stats(include_archive=True):
+    """Recompute every rollup row from the checklist records; returns rows written
+
+    Archived records keep counting towards the totals. Pass
+    include_archive=False while the archive tables don't exist yet.
+    """
+    table = ChecklistDailyStats.__table__
+    record = record_model() if include_archive else ChecklistRecord
+    day = func.date(record.date_performed)
+
+    source = db.session.query(
+        day,
+        record.client_id,
+        record.user_id,
+        func.count(record.id),
+        func.coalesce(func.sum(record.completed_item_count), 0)
+    ).group_by(
+        day, record.client_id, record.user_id
+    )
+
+    db.session.execute(table.delete())
+    result = db.session.execute(table.insert().from_select(
+        ['day', 'client_id', 'user_id', 'check_count', 'completed_item_count'],
+        source.statement
+    ))
+    return result.rowcount
+
+def total_checks(since=None):
+    """Number of checklists performed, optionally from `since` (a date) onwards"""
+    query = db.session.query(func.coalesce(func.sum(ChecklistDailyStats.check_count), 0))
+    if since:
+        query = query.filter(ChecklistDailyStats.day >= since)
+    return query.scalar()
+
+def most_active_clients(limit=5, since=None):
+    """(Client, check count) pairs, busiest first"""
+    check_count = func.sum(ChecklistDailyStats.check_count)
+    query = db.session.query(Client, check_count.label("check_count")).join(
+        ChecklistDailyStats, ChecklistDailyStats.client_id == Client.id
+    )
+    if since:
+        query = query.filter(ChecklistDailyStats.day >= since)
+    return query.group_by(Client.id).order_by(check_count.desc()).limit(limit).all()
+
+def most_active_users(limit=5, since=None):
+    """(User, check count) pairs, busiest first"""
+    check_count = func.sum(ChecklistDailyStats.check_count)
+    query = db.session.query(User, check_count.label("check_count")).join(
+        ChecklistDailyStats, ChecklistDailyStats.user_id == User.id
+    )
+    if since:
+        query = query.filter(ChecklistDailyStats.day >= since)
+    return query.group_by(User.id).order_by(check_count.desc()).limit(limit).all()
+
+def daily_activity(since):
+    """(day, checks, completed items) per day from `since` onwards, newest first"""
+    return db.session.query(
+        ChecklistDailyStats.day,
+        func.sum(ChecklistDailyStats.check_count),
+        func.sum(ChecklistDailyStats.completed_item_count)
+    ).filter(
+        ChecklistDailyStats.day >= since
+    ).group_by(
+        ChecklistDailyStats.day
+    ).order_by(ChecklistDailyStats.day.desc()).all()
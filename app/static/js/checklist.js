@@ -0,0 +1,310 @@
+// submitUrl, dashboardUrl come from the script tag's data attributes
+const checklistPage = document.currentScript.dataset;
+
+let currentCategoryId = null;
+let selectedUsers = {};
+
+function showUserSelection(categoryId) {
+    currentCategoryId = categoryId;
+    const modal = document.getElementById('userSelectionModal');
+    modal.style.display = 'flex';
+
+    // Check previously selected users
+    const checkboxes = modal.querySelectorAll('input[type="checkbox"]');
+    checkboxes.forEach(cb => {
+        cb.checked = selectedUsers[categoryId]?.includes(parseInt(cb.value)) || false;
+    });
+}
+
+function closeUserModal() {
+    document.getElementById('userSelectionModal').style.display = 'none';
+    currentCategoryId = null;
+}
+
+function applyUserSelection() {
+    const checkboxes = document.querySelectorAll('#userSelectionModal input[type="checkbox"]:checked');
+    const users = Array.from(checkboxes).map(cb => ({
+        id: parseInt(cb.value),
+        name: cb.parentElement.textContent.trim()
+    }));
+
+    selectedUsers[currentCategoryId] = users.map(u => u.id);
+    // Debug log
+    console.log('Updated selectedUsers:', selectedUsers);
+    console.log('Current category users:', users);
+
+
+    // Update display
+    const display = document.getElementById(`selected-users-${currentCategoryId}`);
+    if (users.length > 0) {
+        display.textContent = users.map(u => u.name).join(', ');
+    } else {
+        display.textContent = 'No users selected';
+    }
+    saveChecklistState();
+    closeUserModal();
+}
+
+document.querySelector('form:not(#templateForm)').addEventListener('submit', function() {
+    const clientId = document.querySelector('input[name="client_id"]').value;
+    localStorage.removeItem(getStorageKey(clientId));
+});
+
+// Update form submission handler
+document.addEventListener('DOMContentLoaded', function() {
+    const checklistForm = document.querySelector('form:not(#templateForm)');
+    if (checklistForm) {
+        checklistForm.onsubmit = async function(e) {
+            e.preventDefault();
+
+            if (!confirm('Are you sure you want to submit this checklist?')) {
+                return false;
+            }
+
+            // Ignore double-clicks while a submission is in flight
+            const submitButton = checklistForm.querySelector('button[type="submit"]');
+            if (submitButton.disabled) {
+                return false;
+            }
+            submitButton.disabled = true;
+
+            try {
+                // Gather all checked items
+                const checkedItems = Array.from(document.querySelectorAll('input[name="items"]:checked'))
+                    .map(input => input.value);
+
+                // Get notes
+                const notes = document.querySelector('textarea[name="notes"]').value;
+
+                // Get client ID
+                const clientId = document.querySelector('input[name="client_id"]').value;
+
+                // Log the selected users data before submission
+                console.log('Selected Users Data:', selectedUsers);
+
+                // Prepare the data
+                const submitData = {
+                    client_id: clientId,
+                    items: checkedItems,
+                    notes: notes,
+                    per_user_data: selectedUsers,
+                    submission_key: getSubmissionKey(clientId)
+                };
+
+                console.log('Submitting data:', submitData); // Debug log
+
+                let response;
+                try {
+                    response = await fetch(checklistPage.submitUrl, {
+                        method: 'POST',
+                        headers: {
+                            'Content-Type': 'application/json',
+                            'X-Requested-With': 'XMLHttpRequest'
+                        },
+                        body: JSON.stringify(submitData)
+                    });
+                } catch (networkError) {
+                    // Offline: keep the checklist and sync it when the connection returns
+                    queueOfflineChecklist(submitData);
+                    localStorage.removeItem(`checklist_state_${clientId}`);
+                    localStorage.removeItem(getSubmissionKeyStorageKey(clientId));
+                    alert('You appear to be offline. The checklist has been saved and will be submitted automatically when you are back online.');
+                    window.location.href = checklistPage.dashboardUrl;
+                    return;
+                }
+
+                const data = await response.json();
+                console.log('Response from server:', data); // Debug log
+
+                if (data.status === 'success') {
+                    // Clear localStorage
+                    localStorage.removeItem(`checklist_state_${clientId}`);
+                    localStorage.removeItem(getSubmissionKeyStorageKey(clientId));
+                    showSummary(data.summary, data.notes);
+                } else {
+                    throw new Error(data.message || 'Unknown error');
+                }
+            } catch (error) {
+                console.error('Submission error:', error);
+                alert('Error submitting checklist: ' + error.message);
+            } finally {
+                submitButton.disabled = false;
+            }
+        };
+    }
+});
+
+
+    // Checklist state management functions
+    function getStorageKey(clientId) {
+        return `checklist_state_${clientId}`;
+    }
+
+    function getSubmissionKeyStorageKey(clientId) {
+        return `checklist_submission_key_${clientId}`;
+    }
+
+    // Key identifying this submission; kept until the server confirms it so
+    // retries of the same checklist are not recorded twice
+    function getSubmissionKey(clientId) {
+        const storageKey = getSubmissionKeyStorageKey(clientId);
+        let submissionKey = localStorage.getItem(storageKey);
+        if (!submissionKey) {
+            const bytes = new Uint8Array(16);
+            window.crypto.getRandomValues(bytes);
+            submissionKey = Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+            localStorage.setItem(storageKey, submissionKey);
+        }
+        return submissionKey;
+    }
+
+    function saveChecklistState() {
+        const clientId = document.querySelector('input[name="client_id"]').value;
+        const checkboxes = document.querySelectorAll('input[type="checkbox"]');
+        const notes = document.querySelector('textarea[name="notes"]').value;
+
+        const state = {
+            date: new Date().toDateString(),
+            checkedItems: Array.from(checkboxes)
+                .filter(cb => cb.checked)
+                .map(cb => cb.value),
+            notes: notes,
+            selectedUsers: selectedUsers
+        };
+
+        localStorage.setItem(getStorageKey(clientId), JSON.stringify(state));
+    }
+
+    function loadChecklistState() {
+    const clientId = document.querySelector('input[name="client_id"]').value;
+    const savedState = localStorage.getItem(getStorageKey(clientId));
+
+    if (!savedState) return;
+
+    const state = JSON.parse(savedState);
+
+    // Clear state if it's from a previous day
+    if (state.date !== new Date().toDateString()) {
+        localStorage.removeItem(getStorageKey(clientId));
+        return;
+    }
+
+    // Restore checked items
+    state.checkedItems.forEach(itemId => {
+        const checkbox = document.querySelector(`input[type="checkbox"][value="${itemId}"]`);
+        if (checkbox) checkbox.checked = true;
+    });
+
+    // Restore notes
+    const notesTextarea = document.querySelector('textarea[name="notes"]');
+    if (notesTextarea && state.notes) {
+        notesTextarea.value = state.notes;
+    }
+
+    // Restore selected users
+    if (state.selectedUsers) {
+        selectedUsers = state.selectedUsers;
+        // Update the display for each category
+        for (const categoryId in selectedUsers) {
+            const display = document.getElementById(`selected-users-${categoryId}`);
+            if (display) {
+                // Get user names for display
+                const userIds = selectedUsers[categoryId];
+                const userNames = [];
+                userIds.forEach(userId => {
+                    const userLabel = document.querySelector(`label.user-checkbox input[value="${userId}"]`);
+                    if (userLabel) {
+                        userNames.push(userLabel.parentElement.textContent.trim());
+                    }
+                });
+                display.textContent = userNames.length > 0 ? userNames.join(', ') : 'No users selected';
+            }
+        }
+    }
+}
+
+    // Event listeners
+    document.querySelectorAll('input[type="checkbox"]').forEach(checkbox => {
+        checkbox.addEventListener('change', saveChecklistState);
+    });
+
+    const notesTextarea = document.querySelector('textarea[name="notes"]');
+    if (notesTextarea) {
+        notesTextarea.addEventListener('input', saveChecklistState);
+    }
+
+    // Load state when page loads
+    document.addEventListener('DOMContentLoaded', loadChecklistState);
+
+    // Summary functions
+    function showError(message) {
+        const errorDiv = document.getElementById('errorMessage');
+        errorDiv.textContent = message;
+        errorDiv.style.display = 'block';
+        setTimeout(() => {
+            errorDiv.style.display = 'none';
+        }, 5000);
+    }
+
+    function showSummary(summary, notes) {
+    let summaryText = '';
+
+    // Loop through each category in the summary data
+    for (const categoryName in summary) {
+        summaryText += `${categoryName}:\n`;
+
+        // Add selected users if present
+        if (summary[categoryName].users && summary[categoryName].users.length > 0) {
+            summaryText += `Selected Users: ${summary[categoryName].users.join(', ')}\n`;
+            console.log(`Adding users for ${categoryName}:`, summary[categoryName].users);
+        }
+
+        // Add completed items
+        if (summary[categoryName].items && summary[categoryName].items.length > 0) {
+            summary[categoryName].items.forEach(item => {
+                summaryText += `  - ${item}\n`;
+            });
+        }
+
+        summaryText += '\n';
+    }
+
+    // Add notes if present
+    if (notes && notes.trim()) {
+        summaryText += `Notes:\n${notes}\n`;
+    }
+
+    console.log('Final summary text:', summaryText);
+    document.getElementById('summaryContent').textContent = summaryText;
+    document.getElementById('summaryModal').style.display = 'flex';
+}
+
+    function copySummary() {
+        const summaryText = document.getElementById('summaryContent').textContent;
+        const textarea = document.createElement('textarea');
+        textarea.value = summaryText;
+        textarea.style.position = 'fixed';
+        textarea.style.opacity = 0;
+        document.body.appendChild(textarea);
+        textarea.select();
+
+        let success = false;
+        try {
+            success = document.execCommand('copy');
+            if (success) {
+                alert('Summary copied to clipboard!');
+            } else {
+                alert('Unable to copy automatically. Please press Ctrl+C to copy.');
+            }
+        } catch (err) {
+            alert('Unable to copy automatically. Please press Ctrl+C to copy.');
+            console.error('Copy failed:', err);
+        }
+
+        document.body.removeChild(textarea);
+    }
+
+    function closeSummaryModal() {
+        document.getElementById('summaryModal').style.display = 'none';
+        window.location.href = checklistPage.dashboardUrl;
+    }
@@ -0,0 +1,28 @@
+// clientUrl come from the script tag's data attributes
+const dashboardPage = document.currentScript.dataset;
+
+function filterClients() {
+    const input = document.getElementById('clientSearch');
+    const filter = input.value.toLowerCase();
+    const select = document.getElementById('clientDropdown');
+    const options = select.getElementsByTagName('option');
+
+    for (let i = 0; i < options.length; i++) {
+        const txtValue = options[i].text;
+        if (txtValue.toLowerCase().indexOf(filter) > -1) {
+            options[i].style.display = "";
+        } else {
+            options[i].style.display = "none";
+        }
+    }
+}
+
+function viewSelectedClient() {
+    const select = document.getElementById('clientDropdown');
+    const selectedClientId = select.value;
+    if (selectedClientId) {
+        window.location.href = dashboardPage.clientUrl.replace('0', selectedClientId);
+    } else {
+        alert('Please select a client first');
+    }
+}
@@ -0,0 +1,231 @@
+// clientId, addCategoryUrl, saveUrl, checklistUrl come from the script tag's data attributes
+const clientStructure = document.currentScript.dataset;
+
+async function togglePerUser(checkbox, categoryId) {
+    try {
+        const response = await fetch(`/toggle-category-per-user/${categoryId}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                is_per_user: checkbox.checked,
+                client_id: Number(clientStructure.clientId)
+            })
+        });
+
+        const data = await response.json();
+
+        if (!response.ok) {
+            checkbox.checked = !checkbox.checked; // Revert the checkbox
+            alert(data.error || 'Error updating category');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        checkbox.checked = !checkbox.checked; // Revert the checkbox
+        alert('Error updating category');
+    }
+}
+
+function addItem(categoryId) {
+    const categorySection = document.querySelector(`.category-section[data-category-id="${categoryId}"]`);
+    const itemsList = categorySection.querySelector('.items-list');
+
+    const newItem = document.createElement('div');
+    newItem.className = 'checklist-item';
+    newItem.innerHTML = `
+        <input type="text" class="item-input" placeholder="Enter item description">
+        <button type="button" class="remove-item-btn" onclick="removeItem(this)">×</button>
+    `;
+
+    itemsList.appendChild(newItem);
+}
+
+function removeItem(button) {
+    button.closest('.checklist-item').remove();
+}
+
+function addCategory() {
+    const select = document.getElementById('categorySelect');
+    const categoryId = select.value;
+    const categoryName = select.options[select.selectedIndex].text;
+
+    const categoriesContainer = document.getElementById('categories-container');
+
+    // Check if category already exists
+    if (document.querySelector(`.category-section[data-category-id="${categoryId}"]`)) {
+        alert('This category is already added');
+        return;
+    }
+
+    const newCategory = document.createElement('div');
+    newCategory.className = 'category-section';
+    newCategory.dataset.categoryId = categoryId;
+    newCategory.innerHTML = `
+        <div class="category-header">
+            <h3>${categoryName}</h3>
+            <button type="button" class="remove-category-btn" onclick="removeCategory(this)">Remove Category</button>
+        </div>
+        <div class="items-list"></div>
+        <button type="button" class="add-item-btn" onclick="addItem(${categoryId})">Add Item</button>
+    `;
+
+    categoriesContainer.appendChild(newCategory);
+}
+
+function removeCategory(button) {
+    const categorySection = button.closest('.category-section');
+    const categoryId = categorySection.dataset.categoryId;
+    const clientId = clientStructure.clientId;
+
+    if (confirm('Are you sure you want to remove this category and all its items?')) {
+        fetch(`/remove-client-category/${clientId}/${categoryId}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                categorySection.remove();
+            } else {
+                alert('Error removing category: ' + (data.message || 'Unknown error'));
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            alert('Error removing category. Please try again.');
+        });
+    }
+}
+
+function addCustomCategory() {
+    const categoryName = document.getElementById('newCategoryName').value.trim();
+
+    if (!categoryName) {
+        alert('Please enter a category name');
+        return;
+    }
+
+    // Check for existing categories
+    const existingCategories = Array.from(document.querySelectorAll('.category-header h3'))
+        .map(h3 => h3.textContent.toLowerCase());
+
+    if (existingCategories.includes(categoryName.toLowerCase())) {
+        alert('A category with this name already exists');
+        return;
+    }
+
+    fetch(clientStructure.addCategoryUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ name: categoryName })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'success') {
+            const categoriesContainer = document.getElementById('categories-container');
+
+            const newCategory = document.createElement('div');
+            newCategory.className = 'category-section';
+            newCategory.dataset.categoryId = data.category.id;
+            newCategory.innerHTML = `
+                <div class="category-header">
+                    <div class="category-title-group">
+                        <h3>${data.category.name}</h3>
+                        <label class="per-user-toggle">
+                            <input type="checkbox" 
+                                   class="per-user-checkbox" 
+                                   data-category-id="${data.category.id}"
+                                   onchange="togglePerUser(this, ${data.category.id})">
+                            Per User Category
+                        </label>
+                    </div>
+                    <button type="button" class="remove-category-btn" onclick="removeCategory(this)">Remove Category</button>
+                </div>
+                <div class="items-list"></div>
+                <button type="button" class="add-item-btn" onclick="addItem(${data.category.id})">Add Item</button>
+            `;
+
+            categoriesContainer.appendChild(newCategory);
+
+            // Clear the input
+            document.getElementById('newCategoryName').value = '';
+        } else {
+            alert('Error adding category: ' + (data.error || 'Unknown error'));
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Error adding category. Please try again.');
+    });
+}
+
+function findDuplicates(items) {
+    const descriptions = items.map(item => item.description.toLowerCase().trim());
+    const duplicates = descriptions.filter((item, index) => descriptions.indexOf(item) !== index);
+    return [...new Set(duplicates)];
+}
+
+function saveChanges() {
+    const categories = [];
+    let hasDuplicates = false;
+    let duplicateMessages = [];
+
+    document.querySelectorAll('.category-section').forEach(categorySection => {
+        const categoryId = categorySection.dataset.categoryId;
+        const categoryName = categorySection.querySelector('h3').textContent;
+        const isPerUser = categorySection.querySelector('.per-user-checkbox').checked;
+        const items = [];
+
+        const categoryItems = Array.from(categorySection.querySelectorAll('.checklist-item input')).map(input => ({
+            description: input.value.trim()
+        })).filter(item => item.description);
+
+        // Check for duplicates within this category
+        const duplicates = findDuplicates(categoryItems);
+        if (duplicates.length > 0) {
+            hasDuplicates = true;
+            duplicateMessages.push(`Duplicate items found in ${categoryName}: ${duplicates.join(', ')}`);
+        }
+
+        if (categoryItems.length > 0) {
+            categories.push({
+                id: parseInt(categoryId),
+                is_per_user: isPerUser,
+                items: categoryItems
+            });
+        }
+    });
+
+    if (hasDuplicates) {
+        alert('Please remove duplicate items:\n\n' + duplicateMessages.join('\n'));
+        return;
+    }
+
+    // Proceed with saving
+    fetch(clientStructure.saveUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            categories: categories
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'success') {
+            window.location.href = clientStructure.checklistUrl;
+        } else {
+            alert('Error saving changes: ' + (data.message || 'Unknown error'));
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Error saving changes. Please try again.');
+    });
+}
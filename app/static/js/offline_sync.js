@@ -0,0 +1,50 @@
+// Checklists that could not be submitted while offline, synced in one batch
+const OFFLINE_OUTBOX_KEY = 'checklist_offline_outbox';
+const OFFLINE_SYNC_URL = document.currentScript.dataset.syncUrl;
+
+function queueOfflineChecklist(submission) {
+    const outbox = JSON.parse(localStorage.getItem(OFFLINE_OUTBOX_KEY) || '[]');
+    submission.performed_at = submission.performed_at || new Date().toISOString();
+    outbox.push(submission);
+    localStorage.setItem(OFFLINE_OUTBOX_KEY, JSON.stringify(outbox));
+}
+
+async function syncOfflineChecklists() {
+    const outbox = JSON.parse(localStorage.getItem(OFFLINE_OUTBOX_KEY) || '[]');
+    if (!outbox.length || !navigator.onLine) return;
+
+    try {
+        const response = await fetch(OFFLINE_SYNC_URL, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            body: JSON.stringify({ submissions: outbox })
+        });
+        const data = await response.json();
+        if (data.status !== 'success') {
+            console.error('Offline sync failed:', data.message);
+            return;
+        }
+
+        // Keep only the submissions the server could not accept
+        const remaining = outbox.filter((_, index) => data.results[index].status !== 'success');
+        const current = JSON.parse(localStorage.getItem(OFFLINE_OUTBOX_KEY) || '[]');
+        localStorage.setItem(OFFLINE_OUTBOX_KEY, JSON.stringify(remaining.concat(current.slice(outbox.length))));
+
+        const synced = outbox.length - remaining.length;
+        if (synced) {
+            alert(`Synced ${synced} checklist(s) completed offline.`);
+        }
+        remaining.forEach(submission => {
+            const result = data.results[outbox.indexOf(submission)];
+            console.error('Offline checklist rejected:', result.message, submission);
+        });
+    } catch (error) {
+        console.error('Offline sync error:', error);
+    }
+}
+
+window.addEventListener('online', syncOfflineChecklists);
+document.addEventListener('DOMContentLoaded', syncOfflineChecklists);
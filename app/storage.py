@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import quote
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql import Delete, Insert, Update
+
+# PRAGMAs applied to every new SQLite connection, in order. journal_mode
+# goes first because it determines what the synchronous level means.
+_SQLITE_PRAGMAS = [
+    ('journal_mode', 'SQLITE_JOURNAL_MODE'),
+    ('synchronous', 'SQLITE_SYNCHRONOUS'),
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS'),
+    ('cache_size', 'SQLITE_CACHE_SIZE'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE'),
+    ('temp_store', 'SQLITE_TEMP_STORE'),
+    ('wal_autocheckpoint', 'SQLITE_WAL_AUTOCHECKPOINT'),
+]
+
+# PRAGMAs that modify the database file, skipped on read-only connections
+_WRITE_PRAGMAS = {'journal_mode', 'wal_autocheckpoint'}
+
+def sqlite_pragmas(config):
+    """The (pragma, value) pairs configured for SQLite connections"""
+    return [
+        (pragma, config[key]) for pragma, key in _SQLITE_PRAGMAS
+        if config.get(key) is not None
+    ]
+
+def engine_options(config):
+    """SQLAlchemy engine options for the configured database
+
+    SQLite keeps SQLAlchemy's defaults; server databases get a sized pool
+    that recycles and pre-pings its connections.
+    """
+    if config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+def configure_engine(app, engine, read_only=False):
+    """Apply the configured storage profile to every connection of `engine`"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = sqlite_pragmas(app.config)
+    if read_only:
+        pragmas = [(pragma, value) for pragma, value in pragmas if pragma not in _WRITE_PRAGMAS]
+        pragmas.append(('query_only', 'ON'))
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas:
+                cursor.execute(f"PRAGMA {pragma} = {value}")
+        finally:
+            cursor.close()
+
+def create_read_engine(app, engine):
+    """Engine for read-only routes, or None to read through the main engine
+
+    Uses SQLALCHEMY_READ_DATABASE_URI (e.g. a PostgreSQL replica) when set.
+    Otherwise a SQLite file database gets a read-only connection to the
+    same file; in WAL mode its readers never block or wait on writers.
+    """
+    uri = app.config.get('SQLALCHEMY_READ_DATABASE_URI')
+    if uri:
+        read_engine = create_engine(uri, **engine_options(dict(app.config, SQLALCHEMY_DATABASE_URI=uri)))
+    elif (engine.dialect.name == 'sqlite' and app.config.get('SQLITE_READ_ONLY_ENGINE')
+            and engine.url.database not in (None, '', ':memory:')):
+        path = quote(os.path.abspath(engine.url.database))
+        read_engine = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    else:
+        return None
+
+    configure_engine(app, read_engine, read_only=True)
+    return read_engine
+
+class RoutingSession(Session):
+    """Session that reads through the read engine inside read_only() blocks
+
+    Flushes and INSERT/UPDATE/DELETE statements always go to the main
+    engine, so routes that read from the replica can still write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing
+                and not isinstance(clause, (Insert, Update, Delete))
+                and has_app_context() and g.get('read_only')):
+            read_engine = current_app.extensions.get('read_engine')
+            if read_engine is not None:
+                return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@contextmanager
+def read_only():
+    """Route the session's queries to the read engine for the enclosed block"""
+    previous = g.get('read_only', False)
+    g.read_only = True
+    try:
+        yield
+    finally:
+        g.read_only = previous
+
+def read_only_route(f):
+    """Serve a route's queries from the read engine
+
+    The flag stays set for the rest of the request so streamed responses
+    keep reading from the same engine.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.read_only = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+def checkpoint_wal(engine, mode='PASSIVE'):
+    """Copy committed WAL frames back into the database file
+
+    Returns SQLite's (busy, log_frames, checkpointed_frames) row, or None
+    when the database is not SQLite.
+    """
+    if engine.dialect.name != 'sqlite':
+        return None
+    if mode.upper() not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+        raise ValueError(f"Unknown checkpoint mode: {mode}")
+    with engine.connect() as conn:
+        return tuple(conn.exec_driver_sql(f"PRAGMA wal_checkpoint({mode.upper()})").one())
+
+class WalCheckpointer:
+    """Per-process background thread that periodically checkpoints the WAL
+
+    SQLite's automatic checkpoints run inside whichever commit crosses the
+    threshold, and cannot finish while long report reads hold old
+    snapshots. Checkpointing on a timer keeps the WAL file from growing
+    without bound and moves the work off the request path.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self, app, engine):
+        interval = app.config.get('SQLITE_WAL_CHECKPOINT_INTERVAL')
+        if not interval or engine.dialect.name != 'sqlite':
+            return
+        with self._lock:
+            # Threads do not survive a fork, so each worker starts its own
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, args=(app, engine, interval),
+                    name='wal-checkpoint', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self, app, engine, interval):
+        mode = app.config.get('SQLITE_WAL_CHECKPOINT_MODE', 'PASSIVE')
+        while True:
+            time.sleep(interval)
+            try:
+                busy, log_frames, checkpointed = checkpoint_wal(engine, mode)
+                if busy or checkpointed < log_frames:
+                    app.logger.info(
+                        f"WAL checkpoint incomplete: {checkpointed}/{log_frames} frames (busy={busy})"
+                    )
+            except Exception as e:
+                app.logger.error(f"WAL checkpoint failed: {str(e)}")
+
+wal_checkpointer = WalCheckpointer()
@@ -0,0 +1,191 @@
+from app import db
+from app.models import (
+    Client,
+    ChecklistItem,
+    ChecklistRecord,
+    CompletedItem,
+    ChecklistCategory,
+    ChecklistNotes,
+    ClientUser,
+    UserChecklist
+    )
+from app.rollups import record_checklist_rollup
+from app.reports import prefetch_record_data
+from sqlalchemy import insert
+
+def _as_id_set(values, label):
+    try:
+        return {int(value) for value in values}
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {label} id")
+
+def write_checklist_record(client_id, user_id, completed_item_ids, notes_text, per_user_data, date_performed,
+                           submission_key=None):
+    """Write a submitted checklist and return (record, summary data)
+
+    Loads only this client's items and users, checks the submitted ids
+    against them and inserts the per-item rows in bulk. Ids the structure
+    no longer contains are ignored; malformed input raises ValueError.
+    `date_performed` is local time and may carry its timezone. The caller
+    owns the transaction and must commit or roll back.
+    """
+    try:
+        client_id = int(client_id)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid client id")
+    if db.session.get(Client, client_id) is None:
+        raise ValueError(f"Client {client_id} not found")
+
+    # This client's items with their categories, in display order
+    items = db.session.query(
+        ChecklistItem.id, ChecklistItem.description, ChecklistCategory.id, ChecklistCategory.name
+    ).join(
+        ChecklistCategory, ChecklistItem.category_id == ChecklistCategory.id
+    ).filter(
+        ChecklistItem.client_id == client_id
+    ).order_by(ChecklistCategory.id, ChecklistItem.id).all()
+
+    client_users = {
+        client_user.id: client_user.name
+        for client_user in ClientUser.query.filter_by(client_id=client_id).all()
+    }
+
+    # Keep only ids this client's structure still has. A restored draft or
+    # an offline checklist can predate an admin's edit; it is recorded
+    # against the current structure rather than refused
+    item_ids = {item_id for item_id, _, _, _ in items}
+    category_names = {category_id: category_name for _, _, category_id, category_name in items}
+
+    completed_ids = _as_id_set(completed_item_ids, "item") & item_ids
+
+    selected_users = {}
+    for category_key, user_ids in (per_user_data or {}).items():
+        category_id = _as_id_set([category_key], "category").pop()
+        user_ids = _as_id_set(user_ids or [], "user") & client_users.keys()
+        if category_id in category_names:
+            selected_users[category_id] = sorted(user_ids)
+
+    # The column holds naive local wall-clock time. SQLite would drop an
+    # offset anyway, but PostgreSQL would shift the value to its session zone
+    if date_performed.tzinfo is not None:
+        date_performed = date_performed.replace(tzinfo=None)
+
+    # Create record
+    record = ChecklistRecord(
+        client_id=client_id,
+        user_id=user_id,
+        date_performed=date_performed,
+        completed_item_count=len(completed_ids),
+        total_item_count=len(items),
+        submission_key=submission_key
+    )
+    db.session.add(record)
+    db.session.flush()
+
+    # Only completed items are stored; total_item_count on the record keeps
+    # the size of the checklist at submission time
+    completed_rows = []
+    completed_by_category = {}
+    for item_id, description, category_id, _ in items:
+        if item_id in completed_ids:
+            completed_rows.append({
+                'record_id': record.id,
+                'checklist_item_id': item_id,
+                'completed': True,
+                'completed_by': user_id
+            })
+            completed_by_category.setdefault(category_id, []).append(description)
+
+    user_rows = [
+        {'record_id': record.id, 'category_id': category_id, 'client_user_id': client_user_id}
+        for category_id, client_user_ids in selected_users.items()
+        for client_user_id in client_user_ids
+    ]
+
+    if completed_rows:
+        db.session.execute(insert(CompletedItem), completed_rows)
+    if user_rows:
+        db.session.execute(insert(UserChecklist), user_rows)
+
+    # Add notes if provided
+    if notes_text:
+        db.session.add(ChecklistNotes(
+            checklist_record_id=record.id,
+            note_text=notes_text,
+            user_id=user_id
+        ))
+
+    record_checklist_rollup(record)
+
+    # Only add categories to the summary if they have completed items or selected users
+    summary_data = {}
+    for category_id, category_name in category_names.items():
+        if category_id in completed_by_category or category_id in selected_users:
+            summary_data[category_name] = {
+                'items': completed_by_category.get(category_id, []),
+                'users': [client_users[client_user_id] for client_user_id in selected_users.get(category_id, [])]
+            }
+
+    return record, summary_data
+
+class SubmissionKeyConflict(ValueError):
+    """A submission key was reused for a different client or user"""
+
+def find_submitted_record(submission_key, client_id, user_id):
+    """Return the record already written for a submission key, if any"""
+    if not submission_key:
+        return None
+    record = ChecklistRecord.query.filter_by(submission_key=submission_key).first()
+    if record and (str(record.client_id) != str(client_id) or record.user_id != user_id):
+        raise SubmissionKeyConflict("Submission key has already been used")
+    return record
+
+def summarize_record(record):
+    """Rebuild the (summary data, notes text) returned when a record was submitted"""
+    prefetched = prefetch_record_data([record.id])
+    summary_data = {
+        category.name: {
+            'items': data['items'],
+            'users': data['users']
+        }
+        for category, data in prefetched['categories'][record.id].items()
+    }
+    notes = prefetched['notes'].get(record.id)
+    return summary_data, notes.note_text if notes else ''
+
+def sync_checklist_batch(submissions, user_id, resolve_performed_at):
+    """Write many offline submissions in one transaction
+
+    Each submission runs in its own savepoint, so an invalid one is reported
+    and skipped without discarding the others. `resolve_performed_at` turns a
+    submission's performed_at value into the datetime to store. Returns one
+    result dict per submission, in order; the caller commits.
+    """
+    results = []
+    for index, submission in enumerate(submissions):
+        result = {'index': index, 'submission_key': None}
+        try:
+            if not isinstance(submission, dict):
+                raise ValueError("Submission must be an object")
+            submission_key = result['submission_key'] = submission.get('submission_key') or None
+            existing_record = find_submitted_record(submission_key, submission.get('client_id'), user_id)
+            if existing_record:
+                result.update(status='success', record_id=existing_record.id, replayed=True)
+                results.append(result)
+                continue
+
+            with db.session.begin_nested():
+                record, summary_data = write_checklist_record(
+                    client_id=submission.get('client_id'),
+                    user_id=user_id,
+                    completed_item_ids=submission.get('items', []),
+                    notes_text=(submission.get('notes') or '').strip(),
+                    per_user_data=submission.get('per_user_data', {}),
+                    date_performed=resolve_performed_at(submission.get('performed_at')),
+                    submission_key=submission_key
+                )
+            result.update(status='success', record_id=record.id, summary=summary_data)
+        except Exception as e:
+            result.update(status='error', message=str(e))
+        results.append(result)
+    return results
@@ -0,0 +1,280 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, request
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only coordinated within one process
+    fcntl = None
+
+class WriteStats:
+    """Counters describing queue depth, wait times and lock contention"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.groups_committed = 0
+        self.writes_committed = 0
+        self.writes_failed = 0
+        self.lock_retries = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.lock_acquisitions = 0
+        self.total_lock_wait_ms = 0.0
+        self.max_lock_wait_ms = 0.0
+
+    def record_lock_wait(self, wait_ms):
+        with self._lock:
+            self.lock_acquisitions += 1
+            self.total_lock_wait_ms += wait_ms
+            self.max_lock_wait_ms = max(self.max_lock_wait_ms, wait_ms)
+
+    def record_group(self, wait_times_ms, failed):
+        with self._lock:
+            self.groups_committed += 1
+            self.writes_committed += len(wait_times_ms) - failed
+            self.writes_failed += failed
+            self.total_wait_ms += sum(wait_times_ms)
+            self.max_wait_ms = max([self.max_wait_ms] + wait_times_ms)
+
+    def record_retry(self):
+        with self._lock:
+            self.lock_retries += 1
+
+    def as_dict(self):
+        with self._lock:
+            writes = self.writes_committed + self.writes_failed
+            return {
+                'groups_committed': self.groups_committed,
+                'writes_committed': self.writes_committed,
+                'writes_failed': self.writes_failed,
+                'average_group_size': round(writes / self.groups_committed, 2) if self.groups_committed else 0,
+                'lock_retries': self.lock_retries,
+                'average_wait_ms': round(self.total_wait_ms / writes, 2) if writes else 0,
+                'max_wait_ms': round(self.max_wait_ms, 2),
+                'lock_acquisitions': self.lock_acquisitions,
+                'average_lock_wait_ms': round(self.total_lock_wait_ms / self.lock_acquisitions, 2) if self.lock_acquisitions else 0,
+                'max_lock_wait_ms': round(self.max_lock_wait_ms, 2)
+            }
+
+stats = WriteStats()
+
+_thread_lock = threading.Lock()
+_lock_file = None
+
+def _get_lock_file(app):
+    global _lock_file
+    if _lock_file is None:
+        path = app.config.get('WRITE_LOCK_FILE') or os.path.join(app.instance_path, 'write.lock')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _lock_file = open(path, 'a')
+    return _lock_file
+
+@contextmanager
+def write_lock(app=None):
+    """Hold the database write lock shared by every worker process
+
+    Serialising writers here means SQLite never has to arbitrate between
+    them, so they queue in order instead of failing with "database is locked".
+    """
+    app = app or current_app._get_current_object()
+    started = time.monotonic()
+    with _thread_lock:
+        # Server databases arbitrate concurrent writers themselves
+        lock_file = _get_lock_file(app) if fcntl and db.engine.dialect.name == 'sqlite' else None
+        if lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            stats.record_lock_wait((time.monotonic() - started) * 1000)
+            yield
+        finally:
+            if lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def serialized_write(f):
+    """Run a mutating route while holding the shared write lock
+
+    Routes that also accept POST only take the lock for non-GET requests, so
+    rendering their forms is not serialised.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        methods = request.url_rule.methods if request.url_rule else set()
+        if request.method in ('GET', 'HEAD', 'OPTIONS') and 'POST' in methods:
+            return f(*args, **kwargs)
+        with write_lock():
+            return f(*args, **kwargs)
+    return decorated_function
+
+def _begin_write_transaction():
+    """Open the outer transaction before any savepoint is taken
+
+    pysqlite only emits BEGIN ahead of a data change, so a SAVEPOINT issued
+    first would itself become the outer transaction and its RELEASE would
+    commit. BEGIN IMMEDIATE also takes SQLite's write lock up front.
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        db.session.execute(text("BEGIN IMMEDIATE"))
+
+def _is_lock_error(error):
+    message = str(getattr(error, 'orig', error)).lower()
+    return any(reason in message for reason in (
+        'database is locked', 'database is busy',
+        # PostgreSQL: the group can be replayed after these
+        'deadlock detected', 'could not serialize access'
+    ))
+
+class _WriteRequest:
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+class WriteQueue:
+    """Per-process queue whose writer thread commits queued writes in small groups
+
+    Writes are only grouped with others from the same process, so grouping
+    needs a threaded server (gunicorn's gthread worker class).
+
+    Each write is a callable run inside its own savepoint, so one failing
+    write does not discard the rest of its group. The group is committed
+    once; on a lock error the whole group is retried with backoff.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_started(self, app):
+        with self._start_lock:
+            # Threads do not survive a fork, so each worker starts its own
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, args=(app,), name='write-queue', daemon=True
+                )
+                self._thread.start()
+
+    @property
+    def depth(self):
+        return self._queue.qsize()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)` and return a Future with its result"""
+        app = current_app._get_current_object()
+        if not app.config.get('WRITE_QUEUE_ENABLED', True):
+            future = Future()
+            future.set_result(self._run_inline(app, fn, args, kwargs))
+            return future
+
+        write = _WriteRequest(fn, args, kwargs)
+        self._ensure_started(app)
+        self._queue.put(write)
+        return write.future
+
+    def run(self, fn, *args, **kwargs):
+        """Queue a write and wait for its committed result, re-raising its error"""
+        timeout = current_app.config.get('WRITE_QUEUE_TIMEOUT', 30)
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    def _run_inline(self, app, fn, args, kwargs):
+        with write_lock(app):
+            try:
+                _begin_write_transaction()
+                result = fn(*args, **kwargs)
+                db.session.commit()
+                return result
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _next_group(self, app):
+        first = self._queue.get()
+        group = [first]
+        # A lone write is committed straight away. Waiting only pays off when
+        # other requests are writing concurrently, which needs threaded
+        # workers; a sync worker only ever has one write in flight.
+        if self._queue.empty():
+            return group
+        max_batch = app.config.get('WRITE_QUEUE_MAX_BATCH', 20)
+        deadline = time.monotonic() + app.config.get('WRITE_QUEUE_MAX_WAIT_MS', 10) / 1000
+        while len(group) < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                group.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return group
+
+    def _commit_group(self, app, group):
+        retries = app.config.get('WRITE_QUEUE_RETRIES', 5)
+        backoff = app.config.get('WRITE_QUEUE_BACKOFF_MS', 50) / 1000
+
+        for attempt in range(retries + 1):
+            outcomes = []
+            try:
+                with write_lock(app):
+                    _begin_write_transaction()
+                    for write in group:
+                        try:
+                            with db.session.begin_nested():
+                                outcomes.append((True, write.fn(*write.args, **write.kwargs)))
+                        except OperationalError as e:
+                            if _is_lock_error(e):
+                                raise
+                            outcomes.append((False, e))
+                        except Exception as e:
+                            outcomes.append((False, e))
+                    db.session.commit()
+                return outcomes
+            except OperationalError as e:
+                db.session.rollback()
+                if not _is_lock_error(e) or attempt == retries:
+                    raise
+                stats.record_retry()
+                app.logger.warning(f"Database locked, retrying write group (attempt {attempt + 1})")
+                time.sleep(backoff * (2 ** attempt))
+
+    def _run(self, app):
+        while True:
+            group = self._next_group(app)
+            with app.app_context():
+                try:
+                    outcomes = self._commit_group(app, group)
+                except Exception as e:
+                    app.logger.error(f"Write group failed: {str(e)}")
+                    db.session.rollback()
+                    outcomes = [(False, e)] * len(group)
+                finally:
+                    db.session.remove()
+
+            finished = time.monotonic()
+            stats.record_group(
+                [(finished - write.enqueued_at) * 1000 for write in group],
+                failed=sum(1 for ok, _ in outcomes if not ok)
+            )
+            for write, (ok, value) in zip(group, outcomes):
+                if ok:
+                    write.future.set_result(value)
+                else:
+                    write.future.set_exception(value)
+
+write_queue = WriteQueue()
+
+def get_write_stats():
+    return dict(stats.as_dict(), queue_depth=write_queue.depth, pid=os.getpid())
@@ -0,0 +1,24 @@
+# archive_records.py
+import argparse
+import sys
+from app import create_app
+from app.archive import archive_records
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old checklist records into the archive tables")
+    parser.add_argument('--older-than-days', type=int, help="archive records performed more than this many days ago (default ARCHIVE_AFTER_DAYS)")
+    parser.add_argument('--batch-size', type=int, help="records moved per transaction (default ARCHIVE_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            archived = archive_records(args.older_than_days, args.batch_size)
+        except Exception as e:
+            print(f"Error archiving records: {str(e)}")
+            return 1
+        print(f"Archive complete, moved {archived} records")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
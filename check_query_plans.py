@@ -0,0 +1,119 @@
+# check_query_plans.py
+import sys
+from datetime import datetime
+from sqlalchemy import create_engine, inspect
+from app import create_app, db
+from app.models import ChecklistRecord, ChecklistNotes, CompletedItem, ChecklistItem, UserChecklist
+from app.archive import detail_model
+from app.reports import filter_records_by_date, past_cursor
+
+# Tables that grow with every submission and must never be scanned in full
+HOT_TABLES = {'checklist_record', 'completed_items', 'checklist_item', 'user_checklist', 'checklist_notes'}
+RECORD_TABLES = {'checklist_record', 'archived_checklist_record'}
+
+def hot_path_queries():
+    """The statements behind reports, the checklist page and record rendering"""
+    record_ids = [1, 2, 3]
+    queries = {}
+    # Reports read the hot table alone, or hot and archive tables together
+    # when their range reaches past the archive cutoff
+    for label, record in (('', ChecklistRecord), (' incl. archive', detail_model(ChecklistRecord, True))):
+        for kind, column in (('client', record.client_id), ('user', record.user_id)):
+            queries[f'{kind} report (date range){label}'] = filter_records_by_date(
+                db.session.query(record).filter(column == 1), '2024-01-01', '2024-12-31'
+            ).order_by(record.date_performed.desc(), record.id.desc())
+            queries[f'{kind} report (next page){label}'] = db.session.query(record).filter(
+                column == 1, past_cursor(record, datetime(2024, 6, 1), 100)
+            ).order_by(record.date_performed.desc(), record.id.desc()).limit(51)
+    return dict(queries, **{
+        'completed item count': CompletedItem.query.filter_by(record_id=1, completed=True),
+        'completed items for records': CompletedItem.query.filter(
+            CompletedItem.record_id.in_(record_ids)
+        ),
+        'checklist items per category': ChecklistItem.query.filter_by(client_id=1, category_id=1),
+        'per-user selections for records': UserChecklist.query.filter(
+            UserChecklist.record_id.in_(record_ids)
+        ),
+        'notes for records': ChecklistNotes.query.filter(
+            ChecklistNotes.checklist_record_id.in_(record_ids)
+        ),
+    })
+
+def explain(conn, query):
+    # Bound parameters, as the app runs them: with literal values inlined
+    # SQLite can derive index bounds it never gets at run time
+    compiled = query.statement.compile(
+        dialect=conn.dialect, compile_kwargs={'render_postcompile': True}
+    )
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)]
+
+def full_scans(plan):
+    scans = []
+    for detail in plan:
+        words = detail.split()
+        # "SCAN table" is a full table scan; "SEARCH table USING INDEX" is a range scan
+        if len(words) >= 2 and words[0] == 'SCAN' and words[1] in HOT_TABLES:
+            scans.append(detail)
+    return scans
+
+def unbounded_seeks(plan):
+    """Owner/date index searches that read every record of the owner"""
+    seeks = []
+    for detail in plan:
+        words = detail.split()
+        if (len(words) >= 5 and words[0] == 'SEARCH' and words[1] in RECORD_TABLES
+                and words[4].endswith('_date') and 'date_performed' not in detail):
+            seeks.append(detail)
+    return seeks
+
+def missing_indexes(engine):
+    """Indexes declared on the models that the database does not have"""
+    inspector = inspect(engine)
+    existing = {
+        index['name']
+        for table in inspector.get_table_names()
+        for index in inspector.get_indexes(table)
+    }
+    return sorted(
+        f"{table.name}.{index.name}"
+        for table in db.metadata.sorted_tables if table.name in inspector.get_table_names()
+        for index in table.indexes if index.name not in existing
+    )
+
+def check_query_plans():
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            print("Query plan check only supports SQLite")
+            return True
+
+        # Plans are taken on an empty scratch schema: with no sqlite_stat1
+        # statistics the planner's choice depends only on the indexes, not
+        # on how much data the live database happens to hold
+        scratch = create_engine('sqlite://')
+        db.metadata.create_all(scratch)
+
+        ok = True
+        with scratch.connect() as conn:
+            for name, query in hot_path_queries().items():
+                plan = explain(conn, query)
+                scans = full_scans(plan)
+                seeks = unbounded_seeks(plan)
+                print(f"{'FAIL' if scans or seeks else 'ok'}  {name}")
+                for detail in plan:
+                    print(f"      {detail}")
+                ok = ok and not scans and not seeks
+        if not ok:
+            print("Full table scans or unbounded date seeks found; "
+                  "the models are missing an index or a query lacks a date bound")
+
+        missing = missing_indexes(db.engine)
+        for name in missing:
+            print(f"FAIL  database has no index {name}")
+        if missing:
+            print("Indexes missing from the database; run migrate.py")
+        return ok and not missing
+
+if __name__ == '__main__':
+    sys.exit(0 if check_query_plans() else 1)
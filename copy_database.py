@@ -0,0 +1,32 @@
+# copy_database.py
+import argparse
+import os
+import sys
+from app import create_app, db
+from app.migrations import copy_database
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Copy all data from a SQLite database into the database configured by DATABASE_URL"
+    )
+    parser.add_argument('source', help="path of the SQLite file to copy from, e.g. instance/checklist.db")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        source_uri = f"sqlite:///{os.path.abspath(args.source)}"
+        if db.engine.url.render_as_string(hide_password=False) == source_uri:
+            print("DATABASE_URL points at the source database; set it to the target")
+            return 1
+
+        print(f"Copying {args.source} to {db.engine.url.render_as_string(hide_password=True)}...")
+        try:
+            copy_database(source_uri)
+        except Exception as e:
+            print(f"Error copying database: {str(e)}")
+            return 1
+        print("Copy complete")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -115,6 +115,9 @@ print_message "Creating Gunicorn configuration..."
 cat > gunicorn_config.py << EOL
 bind = "unix:/var/www/itchecklist/itchecklist.sock"
 workers = 3
+# Threads let each worker's write queue commit concurrent writes together
+worker_class = "gthread"
+threads = 4
 user = "www-data"
 group = "www-data"
 EOL
@@ -179,6 +182,7 @@ cd /var/www/itchecklist
 git pull origin main
 source venv/bin/activate
 pip install -r requirements.txt
+python3 migrate.py
 
 # Set proper permissions
 chown -R www-data:www-data /var/www/itchecklist/instance
@@ -0,0 +1,52 @@
+# migrate.py
+import argparse
+import sys
+from app import create_app, db
+from app.migrations import (
+    MIGRATIONS, current_version, pending_migrations, run_migrations,
+    backup_sqlite_database, import_legacy_database
+)
+from sqlalchemy import text
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring the database schema up to date")
+    parser.add_argument('--status', action='store_true', help="show the schema version and pending steps, then exit")
+    parser.add_argument('--no-backup', action='store_true', help="skip the SQLite backup taken before migrating")
+    parser.add_argument('--import-legacy', metavar='PATH', help="copy users, clients and templates from an old-schema SQLite file")
+    parser.add_argument('--vacuum', action='store_true', help="reclaim disk space afterwards (SQLite)")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        pending = pending_migrations()
+        print(f"Schema version {current_version()} of {MIGRATIONS[-1][0]}")
+        if args.status:
+            for version, name, _ in pending:
+                print(f"  pending: {version:03d} {name}")
+            return 0
+
+        if (pending or args.import_legacy) and not args.no_backup:
+            backup_path = backup_sqlite_database()
+            if backup_path:
+                print(f"Database backed up to {backup_path}")
+
+        try:
+            applied = run_migrations()
+            if args.import_legacy:
+                print(f"Importing from {args.import_legacy}...")
+                import_legacy_database(args.import_legacy)
+        except Exception as e:
+            print(f"Error during migration: {str(e)}")
+            return 1
+
+        print(f"Applied {len(applied)} step(s); schema is at version {current_version()}")
+
+        if args.vacuum and db.engine.dialect.name == 'sqlite':
+            print("Reclaiming disk space...")
+            with db.engine.connect() as conn:
+                conn.execution_options(isolation_level='AUTOCOMMIT').execute(text('VACUUM'))
+            print("Vacuum complete")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,21 @@
+# rebuild_rollups.py
+from app import create_app, db
+from app.rollups import rebuild_daily_stats
+
+def rebuild_rollups():
+    app = create_app()
+    with app.app_context():
+        # Create the rollup table if it doesn't exist yet
+        db.create_all()
+
+        try:
+            rows = rebuild_daily_stats()
+            db.session.commit()
+            print(f"Rebuilt {rows} daily rollup rows")
+        except Exception as e:
+            print(f"Error rebuilding rollups: {e}")
+            db.session.rollback()
+            raise
+
+if __name__ == '__main__':
+    rebuild_rollups()
@@ -10,6 +10,7 @@ from app.models import (
     Role,
     ChecklistItem
 )
+from app.migrations import stamp_current_version
 import pytz
 from datetime import datetime
 
@@ -150,6 +151,7 @@ def reset_db():
             db.drop_all()
             print("Creating all tables...")
             db.create_all()
+            stamp_current_version()
             print("Creating default data...")
             create_default_data()
             print("Database reset complete!")